@@ -115,6 +115,11 @@ class Flash(Animation):
         )
 
 class Homotopy(Animation):
+    CONFIG = {
+        #If True, homotopy is called once per frame with arrays
+        #of x, y and z, and returns arrays of x', y' and z'
+        "vectorized" : False,
+    }
     def __init__(self, homotopy, mobject, **kwargs):
         """
         Homotopy a function from (x, y, z, t) to (x', y', z')
@@ -123,10 +128,33 @@ class Homotopy(Animation):
         Animation.__init__(self, mobject, **kwargs)
 
     def update_mobject(self, alpha):
-        self.mobject.points = np.array([
-            self.homotopy((x, y, z, alpha))
-            for x, y, z in self.starting_mobject.points
-        ])
+        families = map(
+            Mobject.submobject_family,
+            [self.mobject, self.starting_mobject]
+        )
+        pairs = [
+            (mob, start)
+            for mob, start in zip(*families)
+            if start.get_num_points() > 0
+        ]
+        if len(pairs) == 0:
+            return
+        #The homotopy is evaluated on the points of the whole family
+        start_point_arrays = [start.points for mob, start in pairs]
+        start_points = np.concatenate(start_point_arrays)
+        if self.vectorized:
+            xs, ys, zs = start_points.T
+            points = np.transpose(np.broadcast_arrays(
+                *self.homotopy((xs, ys, zs, alpha))
+            ))
+        else:
+            points = np.array([
+                self.homotopy((x, y, z, alpha))
+                for x, y, z in start_points
+            ])
+        point_slices = get_slices(start_point_arrays)
+        for (mob, start), point_slice in zip(pairs, point_slices):
+            mob.points = points[point_slice]
 
 class PhaseFlow(Animation):
     CONFIG = {
@@ -8,7 +8,14 @@ from helpers import *
 
 from animation import Animation
 from simple_animations import DelayByOrder
-from mobject import Mobject, Point
+from mobject import Mobject, Point, VMobject, PMobject
+
+#Interpolated by VMobject.interpolate_color
+VMOBJECT_INTERPOLATED_ATTRS = [
+    "stroke_rgb", "stroke_width", "fill_rgb", "fill_opacity"
+]
+#Interpolated by PMobject.interpolate_color, with one value per point
+PMOBJECT_INTERPOLATED_ATTRS = ["rgbs", "alphas"]
 
 class Transform(Animation):
     CONFIG = {
@@ -21,6 +28,7 @@ class Transform(Animation):
         digest_config(self, kwargs, locals())
         mobject.align_data(ending_mobject)
         self.init_path_func()
+        self.packing_key = None
 
         Animation.__init__(self, mobject, **kwargs)
         self.name += "To" + str(ending_mobject)  
@@ -40,8 +48,136 @@ class Transform(Animation):
             Mobject.submobject_family,
             [self.mobject, self.starting_mobject, self.ending_mobject]
         )
-        for m, start, end in zip(*families):
-            m.interpolate(start, end, alpha, self.path_func)
+        packing = self.get_packing(*families)
+        if packing is None:
+            for m, start, end in zip(*families):
+                m.interpolate(start, end, alpha, self.path_func)
+            return
+        self.fill_packing(packing)
+        #One call to path_func for the whole family, whose results
+        #are handed back out to each submobject as views
+        points = self.path_func(
+            packing["start_points"], packing["end_points"], alpha
+        )
+        if points is packing["start_points"] or points is packing["end_points"]:
+            points = points.copy()
+        for mob, point_slice in packing["point_slices"]:
+            mob.points = points[point_slice]
+        #Colors and style are interpolated straight, as in interpolate_color
+        for attr, mob_indices, start_values, end_values in packing["attrs"]:
+            if alpha == 1.0:
+                values = end_values.copy()
+            else:
+                values = interpolate(start_values, end_values, alpha)
+            for mob, index in mob_indices:
+                setattr(mob, attr, values[index])
+
+    def get_packing(self, mobjects, starts, ends):
+        """
+        Lays out buffers for the points, and colors, of the starting
+        and ending families, so that update_mobject can interpolate 
+        them all at once.  The layout is redone only when the families,
+        or the sizes of their arrays, change.  Returns None if some 
+        member interpolates differently or its data isn't aligned.
+        """
+        start_points = [start.points for start in starts]
+        end_points = [end.points for end in ends]
+        key = (
+            mobjects, starts, ends,
+            map(len, start_points), map(len, end_points),
+            [getattr(m, "alphas", None) is None for m in starts + ends],
+        )
+        if key == self.packing_key:
+            return self.packing
+        self.packing_key = key
+        self.packing = None
+
+        triples = zip(mobjects, starts, ends)
+        if not all(map(self.is_packable, triples)):
+            return None
+        if map(len, start_points) != map(len, end_points):
+            return None
+        packing = {
+            "starts" : starts,
+            "ends" : ends,
+            "start_points" : np.concatenate(start_points),
+            "end_points" : np.concatenate(end_points),
+            "point_slices" : zip(mobjects, get_slices(start_points)),
+            "attrs" : [],
+            "attr_sources" : [],
+        }
+        for mob_class, attrs in [
+            (VMobject, VMOBJECT_INTERPOLATED_ATTRS),
+            (PMobject, PMOBJECT_INTERPOLATED_ATTRS),
+            ]:
+            class_triples = filter(lambda t : isinstance(t[0], mob_class), triples)
+            if len(class_triples) == 0:
+                continue
+            mobs, mob_starts, mob_ends = zip(*class_triples)
+            for attr in attrs:
+                #Alphas only when some point cloud is translucent
+                if attr == "alphas" and all([
+                    m.alphas is None
+                    for m in mob_starts + mob_ends
+                    ]):
+                    continue
+                try:
+                    start_values = self.get_packed_values(mob_starts, attr)
+                    end_values = self.get_packed_values(mob_ends, attr)
+                except AttributeError:
+                    return None
+                if attr in PMOBJECT_INTERPOLATED_ATTRS:
+                    if map(len, start_values) != map(len, end_values):
+                        return None
+                    indices = get_slices(start_values)
+                    join = np.concatenate
+                else:
+                    indices = range(len(mobs))
+                    join = np.array
+                packing["attrs"].append((
+                    attr, zip(mobs, indices), 
+                    join(start_values), join(end_values),
+                ))
+                packing["attr_sources"].append((mob_starts, mob_ends))
+        self.packing = packing
+        return packing
+
+    def fill_packing(self, packing):
+        """
+        Copies the current arrays of the starting and ending families
+        into the packed buffers, since animations such as 
+        TransformAnimations change those mobjects in place as they go
+        """
+        get_points = op.attrgetter("points")
+        for mobs, buff in [
+            (packing["starts"], packing["start_points"]),
+            (packing["ends"], packing["end_points"]),
+            ]:
+            np.concatenate(map(get_points, mobs), out = buff)
+        for (attr, mob_indices, start_buff, end_buff), sources in zip(
+            packing["attrs"], packing["attr_sources"]
+            ):
+            for mobs, buff in zip(sources, [start_buff, end_buff]):
+                values = self.get_packed_values(mobs, attr)
+                if attr in PMOBJECT_INTERPOLATED_ATTRS:
+                    np.concatenate(values, out = buff)
+                else:
+                    buff[:] = values
+
+    def get_packed_values(self, mobjects, attr):
+        if attr == "alphas":
+            return [m.get_alphas() for m in mobjects]
+        return map(op.attrgetter(attr), mobjects)
+
+    def is_packable(self, (mobject, start, end)):
+        for mob_class in VMobject, PMobject:
+            if all([isinstance(m, mob_class) for m in mobject, start, end]):
+                return all([
+                    getattr(mobject.__class__, name).im_func is \
+                    getattr(mob_class, name).im_func
+                    for name in "interpolate", "interpolate_color"
+                ])
+        return False
 
 
 class ClockwiseTransform(Transform):
@@ -128,11 +264,15 @@ class Rotate(ApplyMethod):
 
 class ApplyPointwiseFunction(ApplyMethod):
     CONFIG = {
-        "run_time" : DEFAULT_POINTWISE_FUNCTION_RUN_TIME
+        "run_time" : DEFAULT_POINTWISE_FUNCTION_RUN_TIME,
+        #See Mobject.apply_function
+        "vectorized" : False,
     }
     def __init__(self, function, mobject, **kwargs):
+        digest_config(self, kwargs)
         ApplyMethod.__init__(
-            self, mobject.apply_function, function, **kwargs
+            self, mobject.apply_function, function, self.vectorized,
+            **kwargs
         )
 
 class FadeToColor(ApplyMethod):
@@ -0,0 +1,315 @@
+import sys
+import os
+import getopt
+import json
+import time
+import resource
+import shutil
+import tempfile
+import traceback
+from distutils.spawn import find_executable
+
+from helpers import *
+from camera import Camera
+from scene import Scene
+from mobject import VMobject, PMobject
+from mobject.mobject import FAMILY_CACHE_STATS, get_family_cache_hit_rate
+from mobject.svg_mobject import SVGMobject
+from animation.transform import Transform
+from topics.geometry import Circle, Square
+
+HELP_MESSAGE = """
+   Usage:
+   python benchmark.py [-o <output file>] [-r <repeats>] [<benchmark name> ...]
+
+   Times each stage of the render pipeline on fixed synthetic 
+   workloads, and reports the rate and peak memory of each as JSON.
+   Every benchmark runs in its own process, so that peak memory is
+   measured separately.  With no names given, all are run.
+
+   -o write the results to this file, rather than printing them
+   -r number of times to repeat each benchmark, of which the 
+      fastest is reported (default 3)
+"""
+
+SVG_FIXTURES = [
+    os.path.join(BENCHMARK_FIXTURE_DIR, name)
+    for name in "equation.svg", "drawing.svg"
+]
+
+class BenchmarkSkipped(Exception):
+    pass
+
+## Workloads
+
+def get_vmobject_workload():
+    np.random.seed(0)
+    return VMobject(*[
+        Circle(
+            radius = np.random.uniform(0.1, 1),
+            color = random_color(),
+            fill_opacity = np.random.uniform(0, 1),
+        ).shift(
+            np.random.uniform(-SPACE_WIDTH, SPACE_WIDTH)*RIGHT + \
+            np.random.uniform(-SPACE_HEIGHT, SPACE_HEIGHT)*UP
+        )
+        for x in range(200)
+    ])
+
+def get_pmobject_workload():
+    np.random.seed(0)
+    num_points = 100000
+    points = np.random.uniform(-1, 1, (num_points, 3))
+    points *= [SPACE_WIDTH, SPACE_HEIGHT, 0]
+    return PMobject().add_points(
+        points, rgbs = np.random.random((num_points, 3))
+    )
+
+def get_svg_workload():
+    return VMobject(*[
+        SVGMobject(svg_file, use_cache = False)
+        for svg_file in SVG_FIXTURES
+    ])
+
+## Benchmarks
+#Each sets up its workload and returns a function to time,
+#how many times to call it per repeat, how many units of
+#work each call does, and the name of that unit
+
+def capture_vmobjects():
+    camera = Camera()
+    mobject = get_vmobject_workload()
+    def capture():
+        camera.reset()
+        camera.capture_mobject(mobject)
+    return capture, 10, 1, "frames"
+
+def capture_pmobjects():
+    camera = Camera()
+    mobject = get_pmobject_workload()
+    def capture():
+        camera.reset()
+        camera.capture_mobject(mobject)
+    return capture, 10, 1, "frames"
+
+def transform_update_mobject():
+    mobject = get_vmobject_workload()
+    target = VMobject(*[
+        Square(side_length = 0.5).shift(submob.get_center())
+        for submob in mobject.submobjects
+    ])
+    transform = Transform(mobject, target)
+    alphas = it.cycle(np.linspace(0, 1, 30))
+    def update():
+        transform.update_mobject(alphas.next())
+    return update, 30, 1, "frames"
+
+def submobject_family():
+    def get_tree(depth):
+        if depth == 0:
+            return Square(side_length = 0.1)
+        return VMobject(*[get_tree(depth - 1) for x in range(4)])
+    mobject = get_tree(5)
+    mobject.submobject_family()
+    #Only count lookups made once the tree is built
+    FAMILY_CACHE_STATS["hits"] = FAMILY_CACHE_STATS["misses"] = 0
+    def shift():
+        mobject.shift(0.01*RIGHT)
+        mobject.submobject_family()
+    shift.get_stats = lambda : {
+        "family_cache_hit_rate" : get_family_cache_hit_rate()
+    }
+    return shift, 30, 1, "shifts"
+
+def float32_points():
+    camera = Camera(**PRODUCTION_QUALITY_CAMERA_CONFIG)
+    workloads = [get_vmobject_workload(), get_pmobject_workload()]
+    def render(point_dtype):
+        camera.reset()
+        for mobject in workloads:
+            mobject.set_point_dtype(point_dtype)
+            camera.capture_mobject(mobject)
+        return camera.get_image()
+    def get_points_bytes():
+        return sum([
+            mob.points.nbytes
+            for mobject in workloads
+            for mob in mobject.submobject_family()
+        ])
+    expected = render("float64")
+    expected_bytes = get_points_bytes()
+    image = render("float32")
+    #Compared at production resolution against float64 rendering
+    capture = lambda : render("float32")
+    capture.get_stats = lambda : {
+        "differing_pixels" : int(np.any(image != expected, axis = 2).sum()),
+        "points_memory_ratio" : float(get_points_bytes())/expected_bytes,
+    }
+    return capture, 5, 1, "frames"
+
+def mobject_copy():
+    mobject = get_svg_workload()
+    return mobject.copy, 20, 1, "copies"
+
+def svg_parsing():
+    def parse():
+        for svg_file in SVG_FIXTURES:
+            SVGMobject(svg_file, use_cache = False)
+    return parse, 3, len(SVG_FIXTURES), "files"
+
+def smooth_handle_points():
+    np.random.seed(0)
+    anchor_arrays = [
+        np.random.random((100, 3))
+        for x in range(100)
+    ]
+    def solve():
+        for anchors in anchor_arrays:
+            get_smooth_handle_points(anchors)
+    return solve, 5, len(anchor_arrays), "solves"
+
+def write_to_movie():
+    if find_executable(FFMPEG_BIN) is None:
+        raise BenchmarkSkipped("%s not found"%FFMPEG_BIN)
+    np.random.seed(0)
+    scene = Scene()
+    height, width = scene.camera.pixel_shape
+    scene.frames = [
+        np.random.randint(0, 256, (height, width, 3)).astype('uint8')
+        for x in range(30)
+    ]
+    directory = tempfile.mkdtemp()
+    def write():
+        scene.write_to_movie(os.path.join(directory, "benchmark"))
+    write.clean_up = lambda : shutil.rmtree(directory)
+    return write, 1, len(scene.frames), "frames"
+
+BENCHMARKS = [
+    capture_vmobjects,
+    capture_pmobjects,
+    transform_update_mobject,
+    submobject_family,
+    float32_points,
+    mobject_copy,
+    svg_parsing,
+    smooth_handle_points,
+    write_to_movie,
+]
+
+## Running
+
+def get_peak_rss():
+    """
+    In megabytes.  ru_maxrss is in kilobytes on linux, bytes on osx
+    """
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        peak_rss /= 1024
+    return peak_rss / 1024.0
+
+def run_benchmark(benchmark, num_repeats):
+    func, num_calls, units_per_call, unit = benchmark()
+    times = []
+    try:
+        for x in range(num_repeats):
+            start_time = time.time()
+            for y in range(num_calls):
+                func()
+            times.append(time.time() - start_time)
+    finally:
+        if hasattr(func, "clean_up"):
+            func.clean_up()
+    best_time = min(times)
+    result = {
+        "unit"         : unit,
+        "per_second"   : num_calls*units_per_call / best_time,
+        "seconds"      : best_time,
+        "peak_rss_mb"  : get_peak_rss(),
+    }
+    if hasattr(func, "get_stats"):
+        result.update(func.get_stats())
+    return result
+
+def run_in_subprocess(benchmark, num_repeats):
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        #Keep anything the pipeline prints out of the report
+        sys.stdout = open(os.devnull, "w")
+        try:
+            result = run_benchmark(benchmark, num_repeats)
+        except BenchmarkSkipped as error:
+            result = {"skipped" : str(error)}
+        except:
+            result = {"error" : traceback.format_exc()}
+        with os.fdopen(write_fd, "w") as result_file:
+            json.dump(result, result_file)
+        os._exit(0)
+    os.close(write_fd)
+    with os.fdopen(read_fd) as result_file:
+        output = result_file.read()
+    os.waitpid(pid, 0)
+    try:
+        return json.loads(output)
+    except ValueError:
+        return {"error" : "Benchmark process died"}
+
+def get_configuration(sys_argv):
+    try:
+        opts, args = getopt.getopt(sys_argv[1:], 'ho:r:')
+    except getopt.GetoptError as err:
+        print str(err)
+        sys.exit(2)
+    config = {
+        "output_file" : None,
+        "num_repeats" : 3,
+        "benchmarks"  : BENCHMARKS,
+    }
+    for opt, arg in opts:
+        if opt == '-h':
+            print HELP_MESSAGE
+            sys.exit()
+        elif opt == '-o':
+            config["output_file"] = arg
+        elif opt == '-r':
+            config["num_repeats"] = max(int(arg), 1)
+    if len(args) > 0:
+        names_to_benchmarks = dict([
+            (benchmark.__name__, benchmark)
+            for benchmark in BENCHMARKS
+        ])
+        for name in args:
+            if name not in names_to_benchmarks:
+                print "No benchmark named %s, choose from:"%name
+                print "\n".join(sorted(names_to_benchmarks))
+                sys.exit(2)
+        config["benchmarks"] = [names_to_benchmarks[name] for name in args]
+    return config
+
+def main():
+    config = get_configuration(sys.argv)
+    report = {
+        "python"     : sys.version.split()[0],
+        "numpy"      : np.__version__,
+        "platform"   : sys.platform,
+        "timestamp"  : time.time(),
+        "benchmarks" : dict([
+            (benchmark.__name__, run_in_subprocess(
+                benchmark, config["num_repeats"]
+            ))
+            for benchmark in config["benchmarks"]
+        ])
+    }
+    output = json.dumps(
+        report, indent = 4, sort_keys = True, separators = (",", ": ")
+    )
+    if config["output_file"] is None:
+        print output
+    else:
+        with open(config["output_file"], "w") as output_file:
+            output_file.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
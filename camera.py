@@ -9,6 +9,11 @@ import aggdraw
 from helpers import *
 from mobject import PMobject, VMobject
 
+#Format strings for paths, keyed by (num_cubics, closed)
+PATH_TEMPLATES = {}
+#Pixel offsets to stamp each point with, keyed by thickness
+THICKENING_KERNELS = {}
+
 class Camera(object):
     CONFIG = {
         #background of a different shape will overwrite this
@@ -21,6 +26,8 @@ class Camera(object):
 
     def __init__(self, background = None, **kwargs):
         digest_config(self, kwargs, locals())
+        self.layer_cache = None
+        self.coordinate_grids = None
         self.init_background()
         self.resize_space_shape()
         self.reset()
@@ -56,60 +63,163 @@ class Camera(object):
 
     def set_image(self, pixel_array):
         self.pixel_array = np.array(pixel_array)
+        #Remembered so that cached layers are only reused
+        #on top of the same background
+        self.image_source = pixel_array
 
     def reset(self):
-        self.set_image(np.array(self.background))
+        self.set_image(self.background)
 
     def capture_mobject(self, mobject):
         return self.capture_mobjects([mobject])
 
-    def capture_mobjects(self, mobjects, include_submobjects = True):
+    def capture_mobjects(self, mobjects, include_submobjects = True,
+                         use_layer_cache = False):
         if include_submobjects:
             mobjects = it.chain(*[
                 mob.nonempty_family_members() 
                 for mob in mobjects
             ])
-        vmobjects = []
+        #Point clouds are drawn beneath vectorized mobjects
+        pmobjects, vmobjects = [], []
         for mobject in mobjects:
             if isinstance(mobject, VMobject):
                 vmobjects.append(mobject)
             elif isinstance(mobject, PMobject):
-                self.display_point_cloud(
-                    mobject.points, mobject.rgbs, 
-                    self.adjusted_thickness(mobject.stroke_width)
-                )
+                pmobjects.append(mobject)
             #TODO, more?  Call out if it's unknown?
+        if use_layer_cache:
+            self.draw_with_layer_cache(pmobjects + vmobjects)
+        else:
+            self.draw_mobjects(pmobjects + vmobjects)
+        self.image_source = None
+
+    def draw_mobjects(self, mobjects, checkpoint = None):
+        """
+        Point clouds in mobjects are expected to all come before 
+        vectorized mobjects.  If checkpoint is given, this returns
+        a copy of the image as it was after drawing only the first 
+        checkpoint mobjects.
+        """
+        pmobjects = filter(
+            lambda m : not isinstance(m, VMobject), 
+            mobjects
+        )
+        vmobjects = mobjects[len(pmobjects):]
+        snapshot = None
+        for i, pmobject in enumerate(pmobjects):
+            if i == checkpoint:
+                snapshot = self.get_image()
+            self.display_point_cloud(
+                pmobject.points, pmobject.rgbs, 
+                self.adjusted_thickness(pmobject.stroke_width),
+                pmobject.alphas,
+            )
+        if checkpoint == len(pmobjects):
+            snapshot = self.get_image()
+        if len(vmobjects) == 0:
+            return snapshot
         image = Image.fromarray(self.pixel_array, mode = "RGB")
         canvas = aggdraw.Draw(image)
-        for vmobject in vmobjects:
-            self.display_vectorized(vmobject, canvas)
+        if checkpoint is not None and checkpoint > len(pmobjects):
+            split_index = checkpoint - len(pmobjects)
+            self.display_multiple_vectorized(vmobjects[:split_index], canvas)
+            canvas.flush()
+            snapshot = np.array(image)
+            vmobjects = vmobjects[split_index:]
+        self.display_multiple_vectorized(vmobjects, canvas)
         canvas.flush()            
         self.pixel_array[:,:] = np.array(image)
+        return snapshot
 
+    def draw_with_layer_cache(self, mobjects):
+        """
+        Compares each mobject's render state against the previous
+        call, and only redraws from the first one which changed.
+        Everything beneath that point is restored from the image
+        cached the last time it was drawn.  Mobjects after a changed
+        one are redrawn even if they are unchanged themselves, since
+        they may cover it.
+        """
+        states = [mob.get_render_state() for mob in mobjects]
+        cache = self.layer_cache
+        num_clean = 0
+        if cache is None or cache["background"] is not self.image_source \
+           or cache["geometry"] != self.get_geometry():
+            #Nothing drawn before can be reused
+            cache = {"num_cached" : 0, "image" : None}
+        else:
+            for mob, state, old_mob, old_state in zip(
+                mobjects, states, cache["mobjects"], cache["states"]
+                ):
+                if mob is not old_mob or state != old_state:
+                    break
+                num_clean += 1
+        start = 0
+        if 0 < cache["num_cached"] <= num_clean:
+            start = cache["num_cached"]
+            self.pixel_array[:,:] = cache["image"]
+        if num_clean > start:
+            cache["num_cached"] = num_clean
+            cache["image"] = self.draw_mobjects(
+                mobjects[start:], checkpoint = num_clean - start
+            )
+        else:
+            if start == 0:
+                cache["num_cached"] = 0
+                cache["image"] = None
+            self.draw_mobjects(mobjects[start:])
+        cache.update({
+            "background" : self.image_source,
+            "geometry" : self.get_geometry(),
+            "mobjects" : mobjects,
+            "states" : states,
+        })
+        self.layer_cache = cache
+
+    def get_geometry(self):
+        return (
+            tuple(self.pixel_shape),
+            tuple(self.space_shape),
+            tuple(self.space_center),
+        )
+
+    def get_coordinate_grids(self):
+        """
+        Arrays of the x and y values in space of each pixel,
+        recomputed only when the geometry changes
+        """
+        geometry = self.get_geometry()
+        if self.coordinate_grids is None \
+           or self.coordinate_grids[0] != geometry:
+            (h, w) = self.pixel_shape
+            scalar = 2*self.space_shape[0] / h
+            xs =  scalar*np.arange(-w/2, w/2)+self.space_center[0]
+            ys = -scalar*np.arange(-h/2, h/2)+self.space_center[1]
+            x_array, y_array = np.meshgrid(xs, ys)
+            self.coordinate_grids = (geometry, x_array, y_array)
+        return self.coordinate_grids
 
     def display_region(self, region):
-        (h, w) = self.pixel_shape
-        scalar = 2*self.space_shape[0] / h
-        xs =  scalar*np.arange(-w/2, w/2)+self.space_center[0]
-        ys = -scalar*np.arange(-h/2, h/2)+self.space_center[1]
-        x_array = np.dot(np.ones((h, 1)), xs.reshape((1, w)))
-        y_array = np.dot(ys.reshape(h, 1), np.ones((1, w)))
-        covered = region.condition(x_array, y_array)
+        geometry, x_array, y_array = self.get_coordinate_grids()
+        covered = region.get_mask(x_array, y_array, geometry)
         rgb = np.array(Color(region.color).get_rgb())
         rgb = (255*rgb).astype('uint8')
         self.pixel_array[covered] = rgb
 
 
     def display_vectorized(self, vmobject, canvas):
-        if vmobject.is_subpath:
-            #Subpath vectorized mobjects are taken care
-            #of by their parent
-            return
-        pen, fill = self.get_pen_and_fill(vmobject)
-        pathstring = self.get_pathstring(vmobject)
-        symbol = aggdraw.Symbol(pathstring)
-        canvas.symbol((0, 0), symbol, pen, fill)
-
+        self.display_multiple_vectorized([vmobject], canvas)
+
+    def display_multiple_vectorized(self, vmobjects, canvas):
+        #Subpath vectorized mobjects are taken care
+        #of by their parent
+        vmobjects = [vm for vm in vmobjects if not vm.is_subpath]
+        pathstrings = self.get_pathstrings(vmobjects)
+        for vmobject, pathstring in zip(vmobjects, pathstrings):
+            pen, fill = self.get_pen_and_fill(vmobject)
+            symbol = aggdraw.Symbol(pathstring)
+            canvas.symbol((0, 0), symbol, pen, fill)
 
     def get_pen_and_fill(self, vmobject):
         pen = aggdraw.Pen(
@@ -123,57 +233,120 @@ class Camera(object):
         return (pen, fill)
 
     def get_pathstring(self, vmobject):
-        result = ""        
-        for mob in [vmobject]+vmobject.get_subpath_mobjects():
-            points = mob.points
-            if len(points) == 0:
-                continue
-            coords = self.points_to_pixel_coords(points)
-            if np.all(~self.on_screen_pixels(coords)):
-                return result
-            start = "M%d %d"%tuple(coords[0])
-            #(handle1, handle2, anchor) tripletes
-            triplets = zip(*[
-                coords[i+1::3]
-                for i in range(3)
-            ])
-            cubics = [
-                "C" + " ".join(map(str, it.chain(*triplet)))
-                for triplet in triplets
+        return self.get_pathstrings([vmobject])[0]
+
+    def get_pathstrings(self, vmobjects):
+        """
+        Builds the svg-style path strings for many vmobjects at once.
+        Points of every path are converted to pixel coordinates in
+        a single pass, and each vmobject's string is then filled in
+        with one formatting operation.
+        """
+        paths_by_vmobject = [
+            [
+                mob.points
+                for mob in [vmobject]+vmobject.get_subpath_mobjects()
+                if len(mob.points) > 0
             ]
-            end = "Z" if vmobject.mark_paths_closed else ""
-            result += " ".join([start] + cubics + [end])
+            for vmobject in vmobjects
+        ]
+        all_paths = list(it.chain(*paths_by_vmobject))
+        if len(all_paths) == 0:
+            return [""]*len(vmobjects)
+        lengths = np.array(map(len, all_paths))
+        starts = np.append(0, np.cumsum(lengths)[:-1])
+        coords = self.points_to_pixel_coords(np.concatenate(all_paths))
+        path_is_on_screen = np.logical_or.reduceat(
+            self.on_screen_pixels(coords), starts
+        )
+        result = []
+        path_index = 0
+        for vmobject, paths in zip(vmobjects, paths_by_vmobject):
+            templates, values = [], []
+            for count in range(len(paths)):
+                index = path_index + count
+                if not path_is_on_screen[index]:
+                    break
+                #Only complete (handle1, handle2, anchor) triplets count
+                num_cubics = (lengths[index]-1)/3
+                start = starts[index]
+                end = start + 3*num_cubics + 1
+                templates.append(self.get_path_template(
+                    num_cubics, vmobject.mark_paths_closed
+                ))
+                values += coords[start:end].ravel().tolist()
+            path_index += len(paths)
+            result.append("".join(templates)%tuple(values))
         return result
 
-    def display_point_cloud(self, points, rgbs, thickness):
+    def get_path_template(self, num_cubics, closed):
+        key = (num_cubics, closed)
+        if key not in PATH_TEMPLATES:
+            PATH_TEMPLATES[key] = " ".join(
+                ["M%d %d"] + 
+                ["C%d %d %d %d %d %d"]*num_cubics + 
+                ["Z" if closed else ""]
+            )
+        return PATH_TEMPLATES[key]
+
+    def display_point_cloud(self, points, rgbs, thickness, alphas = None):
+        """
+        Each point is stamped with a disk of the given thickness.
+        Opaque points are painted in order, so later points cover
+        earlier ones.  Given alphas, the stamps covering each pixel 
+        have their colors averaged, weighted by alpha, and blended over
+        what is beneath according to their combined opacity.
+        """
         if len(points) == 0:
             return
         points = self.align_points_to_camera(points)
         pixel_coords = self.points_to_pixel_coords(points)
-        pixel_coords = self.thickened_coordinates(
-            pixel_coords, thickness
-        )
-
-        rgbs = (255*rgbs).astype('uint8')
-        target_len = len(pixel_coords)
-        factor = target_len/len(rgbs)
-        rgbs = np.array([rgbs]*factor).reshape((target_len, 3))
-
-        on_screen_indices = self.on_screen_pixels(pixel_coords)        
-        pixel_coords = pixel_coords[on_screen_indices]        
-        rgbs = rgbs[on_screen_indices]
-
+        kernel = self.get_thickening_kernel(thickness)
         ph, pw = self.pixel_shape
 
-        flattener = np.array([1, pw], dtype = 'int')
-        flattener = flattener.reshape((2, 1))
-        indices = np.dot(pixel_coords, flattener)[:,0]
-        indices = indices.astype('int')
-        
+        #One row per point, one column per kernel offset,
+        #so stamps are flattened in drawing order
+        xs = np.add.outer(pixel_coords[:,0], kernel[:,0])
+        ys = np.add.outer(pixel_coords[:,1], kernel[:,1])
+        on_screen = reduce(op.and_, [
+            xs >= 0, xs < pw, ys >= 0, ys < ph
+        ])
+        point_indices = np.nonzero(on_screen)[0]
+        if len(point_indices) == 0:
+            return
+        indices = ys[on_screen]*pw + xs[on_screen]
         new_pa = self.pixel_array.reshape((ph*pw, 3))
-        new_pa[indices] = rgbs
+        if alphas is None:
+            rgbs = (255*rgbs).astype('uint8')
+            new_pa[indices] = rgbs[point_indices]
+        else:
+            self.blend_stamps(
+                new_pa, indices, rgbs[point_indices], alphas[point_indices]
+            )
         self.pixel_array = new_pa.reshape((ph, pw, 3))
 
+    def blend_stamps(self, flat_pixel_array, indices, rgbs, alphas):
+        #Number the covered pixels, so that sums over 
+        #each one only take as much room as there are stamps
+        covered = np.nonzero(np.bincount(
+            indices, alphas, len(flat_pixel_array)
+        ))[0]
+        numbering = np.zeros(len(flat_pixel_array), dtype = 'int')
+        numbering[covered] = np.arange(len(covered))
+        indices = numbering[indices]
+        alpha_sums = np.bincount(indices, alphas, len(covered))
+        colors = np.array([
+            np.bincount(indices, alphas*rgbs[:,i], len(covered))
+            for i in range(3)
+        ])
+        colors *= 255/alpha_sums
+        with np.errstate(divide = "ignore"):
+            transparencies = np.exp(np.bincount(
+                indices, np.log(1 - alphas), len(covered)
+            ))
+        colors *= 1 - transparencies
+        colors += transparencies*flat_pixel_array[covered].T
+        flat_pixel_array[covered] = colors.T.astype('uint8')
 
     def align_points_to_camera(self, points):
         ## This is where projection should live
@@ -207,21 +380,17 @@ class Camera(object):
         factor = sum(big_shape)/sum(self.pixel_shape)
         return 1 + (thickness-1)/factor
 
-    def get_thickening_nudges(self, thickness):
-        _range = range(-thickness/2+1, thickness/2+1)
-        return np.array(
-            list(it.product([0], _range))+
-            list(it.product(_range, [0]))
-        )
-
-    def thickened_coordinates(self, pixel_coords, thickness):
-        nudges = self.get_thickening_nudges(thickness)
-        pixel_coords = np.array([
-            pixel_coords + nudge
-            for nudge in nudges
-        ])
-        size = pixel_coords.size
-        return pixel_coords.reshape((size/2, 2))
+    def get_thickening_kernel(self, thickness):
+        """
+        Pixel offsets covering a disk of diameter thickness
+        """
+        if thickness not in THICKENING_KERNELS:
+            radius = max(thickness, 1)/2.0
+            span = np.arange(-int(radius), int(radius)+1)
+            kernel = np.array(list(it.product(span, span)))
+            kernel = kernel[(kernel**2).sum(1) <= radius**2]
+            THICKENING_KERNELS[thickness] = kernel
+        return THICKENING_KERNELS[thickness]
 
 
 
@@ -0,0 +1,203 @@
+import sys
+import shutil
+import tempfile
+import traceback
+from distutils.spawn import find_executable
+
+from helpers import *
+from camera import Camera
+from scene import Scene
+from animation.simple_animations import PhaseFlow, MoveAlongPath
+from animation.transform import ApplyMethod, TransformAnimations
+from topics.geometry import Square, Line
+from benchmark import get_vmobject_workload, get_pmobject_workload, \
+    get_svg_workload
+
+HELP_MESSAGE = """
+   Usage:
+   python check_render.py [<check name> ...]
+
+   Runs checks that rendering options which should only change how
+   fast, or in how much memory, a scene renders leave its frames 
+   unchanged.  Each check prints ok, skipped or FAILED, and the exit
+   status is 1 if any failed.  With no names given, all are run.
+"""
+
+#Largest fraction of pixels allowed to differ when point clouds
+#are drawn from float32 rather than float64 points.  A point within
+#float32 rounding of a pixel boundary can land in the next pixel,
+#which for the 100000 point workload is a handful of pixels.
+POINT_CLOUD_PIXEL_TOLERANCE = 1e-5
+
+class CheckFailed(Exception):
+    pass
+
+class CheckSkipped(Exception):
+    pass
+
+def check(condition, message):
+    if not condition:
+        raise CheckFailed(message)
+
+## Checks
+
+class SegmentCheckScene(Scene):
+    CONFIG = {
+        "camera_config" : LOW_QUALITY_CAMERA_CONFIG,
+    }
+    def __init__(self, **kwargs):
+        self.written_frames = []
+        Scene.__init__(self, **kwargs)
+
+    def construct(self):
+        #PhaseFlow keeps state between updates
+        self.square = Square()
+        self.play(PhaseFlow(
+            lambda p : 0.5*np.array([-p[1], p[0], 0]),
+            self.square, run_time = 0.4
+        ))
+        self.play(ApplyMethod(self.square.shift, RIGHT, run_time = 0.2))
+        self.dither(0.2)
+
+    def write_frames(self, frames):
+        self.written_frames += frames
+        Scene.write_frames(self, frames)
+
+def write_segments():
+    if find_executable(FFMPEG_BIN) is None:
+        raise CheckSkipped("%s not found"%FFMPEG_BIN)
+    expected = SegmentCheckScene()
+    directory = tempfile.mkdtemp()
+    try:
+        #Once with every segment rendered, then once with
+        #every segment taken from the cache
+        for cached in False, True:
+            scene = SegmentCheckScene(
+                write_segments = True,
+                movie_prefix = directory,
+            )
+            check(
+                np.allclose(scene.square.points, expected.square.points),
+                "End state differs with write_segments"
+            )
+            if cached:
+                check(
+                    len(scene.written_frames) == 0,
+                    "Cached segments were rendered again"
+                )
+                continue
+            check(
+                len(scene.written_frames) == len(expected.frames),
+                "%d frames written with write_segments, %d without"%(
+                    len(scene.written_frames), len(expected.frames)
+                )
+            )
+            for frame, expected_frame in zip(
+                scene.written_frames, expected.frames
+                ):
+                check(
+                    np.all(frame == expected_frame),
+                    "Frames differ with write_segments"
+                )
+    finally:
+        shutil.rmtree(directory)
+
+def get_differing_pixel_count(mobject, point_dtype):
+    """
+    Number of pixels which differ, at production resolution, 
+    between mobject drawn with float64 points and with point_dtype
+    """
+    camera = Camera(**PRODUCTION_QUALITY_CAMERA_CONFIG)
+    images = []
+    for dtype in "float64", point_dtype:
+        mobject.set_point_dtype(dtype)
+        camera.reset()
+        camera.capture_mobject(mobject)
+        images.append(camera.get_image())
+    return int(np.any(images[0] != images[1], axis = 2).sum())
+
+def float32_points():
+    for get_workload in get_vmobject_workload, get_svg_workload:
+        num_differing = get_differing_pixel_count(get_workload(), "float32")
+        check(
+            num_differing == 0,
+            "%d pixels differ with float32 points in %s"%(
+                num_differing, get_workload.__name__
+            )
+        )
+    height, width = PRODUCTION_QUALITY_CAMERA_CONFIG["pixel_shape"]
+    num_differing = get_differing_pixel_count(
+        get_pmobject_workload(), "float32"
+    )
+    check(
+        num_differing <= POINT_CLOUD_PIXEL_TOLERANCE*height*width,
+        "%d pixels differ with float32 points in a point cloud"%num_differing
+    )
+
+def packed_transforms():
+    """
+    Transform interpolates whole families at once.  This compares
+    it, on a TransformAnimations whose starting and ending mobjects
+    move in place every frame, with interpolating member by member.
+    """
+    def get_animation():
+        return TransformAnimations(
+            MoveAlongPath(Square(), Line(LEFT*3.0, RIGHT*3.0)),
+            MoveAlongPath(Square(), Line(DOWN*2.0, UP*2.0)),
+        )
+    packed, unpacked = get_animation(), get_animation()
+    unpacked.get_packing = lambda *families : None
+    for alpha in np.linspace(0, 1, 11):
+        for animation in packed, unpacked:
+            animation.update(alpha)
+        check(
+            np.allclose(packed.mobject.points, unpacked.mobject.points),
+            "Packed transform differs at alpha = %.1f"%alpha
+        )
+
+CHECKS = [
+    write_segments,
+    packed_transforms,
+    float32_points,
+]
+
+## Running
+
+def run_check(check_function):
+    try:
+        check_function()
+    except CheckSkipped as error:
+        return "skipped: %s"%error
+    except CheckFailed as error:
+        return "FAILED: %s"%error
+    except:
+        return "FAILED:\n%s"%traceback.format_exc()
+    return "ok"
+
+def main():
+    if "-h" in sys.argv[1:]:
+        print HELP_MESSAGE
+        sys.exit()
+    names_to_checks = dict([
+        (check_function.__name__, check_function)
+        for check_function in CHECKS
+    ])
+    checks = CHECKS
+    if len(sys.argv) > 1:
+        for name in sys.argv[1:]:
+            if name not in names_to_checks:
+                print "No check named %s, choose from:"%name
+                print "\n".join(sorted(names_to_checks))
+                sys.exit(2)
+        checks = [names_to_checks[name] for name in sys.argv[1:]]
+    num_failed = 0
+    for check_function in checks:
+        outcome = run_check(check_function)
+        print "%s: %s"%(check_function.__name__, outcome)
+        if outcome.startswith("FAILED"):
+            num_failed += 1
+    sys.exit(1 if num_failed > 0 else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,8 @@ import numpy as np
 DEFAULT_HEIGHT = 1080
 DEFAULT_WIDTH  = 1920
 DEFAULT_FRAME_DURATION = 0.04
+#Number of recent frames held in memory when streaming to a movie
+DEFAULT_FRAME_BUFFER_SIZE = 50
 
 #There might be other configuration than pixel_shape later...
 PRODUCTION_QUALITY_CAMERA_CONFIG = {
@@ -24,6 +26,10 @@ DEFAULT_POINT_DENSITY_1D = 250
 
 DEFAULT_POINT_THICKNESS = 3
 
+#Type in which mobjects store their points.  'float32' halves the
+#memory of point arrays, see Mobject.set_point_dtype
+DEFAULT_POINT_DTYPE = 'float64'
+
 #TODO, Make sure these are not needed
 SPACE_HEIGHT = 4.0
 SPACE_WIDTH = SPACE_HEIGHT * DEFAULT_WIDTH / DEFAULT_HEIGHT
@@ -62,16 +68,22 @@ TEX_DIR           = os.path.join(FILE_DIR, "Tex")
 TEX_IMAGE_DIR     = os.path.join(IMAGE_DIR, "Tex")
 MOBJECT_DIR       = os.path.join(FILE_DIR, "mobjects")
 IMAGE_MOBJECT_DIR = os.path.join(MOBJECT_DIR, "image")
+SVG_MOBJECT_DIR   = os.path.join(MOBJECT_DIR, "svg")
 
 for folder in [FILE_DIR, IMAGE_DIR, GIF_DIR, MOVIE_DIR, TEX_DIR,
                TEX_IMAGE_DIR, MOBJECT_DIR, IMAGE_MOBJECT_DIR,
-               STAGED_SCENES_DIR]:
+               SVG_MOBJECT_DIR, STAGED_SCENES_DIR]:
     if not os.path.exists(folder):
         os.mkdir(folder)
 
 TEX_TEXT_TO_REPLACE = "YourTextHere"
+TEX_CACHE_INDEX_FILE = os.path.join(TEX_DIR, "index.json")
+#Least recently used entries of TEX_DIR are removed past this
+#many bytes.  Set to None to let the cache grow without bound.
+TEX_CACHE_MAX_SIZE = 500*(2**20)
 TEMPLATE_TEX_FILE  = os.path.join(THIS_DIR, "template.tex")
 TEMPLATE_TEXT_FILE = os.path.join(THIS_DIR, "text_template.tex")
+BENCHMARK_FIXTURE_DIR = os.path.join(THIS_DIR, "benchmark_fixtures")
 
 
 LOGO_PATH = os.path.join(IMAGE_DIR, "logo.png")
@@ -7,10 +7,14 @@ import itertools as it
 import inspect
 import traceback
 import imp
+import time
+import signal
+import multiprocessing as mp
 
 from helpers import *
 from scene import Scene
 from camera import Camera
+from mobject.tex_mobject import compile_tex_in_scenes, save_tex_cache_index
 
 HELP_MESSAGE = """
    Usage: 
@@ -23,6 +27,11 @@ HELP_MESSAGE = """
    -m use medium quality
    -a run and save every scene in the script, or all args for the given scene
    -q don't pring progress
+   -f stream frames to the movie file while rendering, rather than
+      holding every frame in memory until the scene is done
+   -j <N> render independent scenes in N parallel worker processes
+   -c write each animation to a cached movie segment, so that re-running
+      only re-renders the animations which changed (not with -f)
 """
 SCENE_NOT_FOUND_MESSAGE = """
    That scene is not in the script
@@ -41,7 +50,7 @@ NO_SCENE_MESSAGE = """
 
 def get_configuration(sys_argv):
    try:
-      opts, args = getopt.getopt(sys_argv[1:], 'hlmpwsqa')
+      opts, args = getopt.getopt(sys_argv[1:], 'hlmpwsqafcj:')
    except getopt.GetoptError as err:
       print str(err)
       sys.exit(2)
@@ -55,6 +64,9 @@ def get_configuration(sys_argv):
       "save_image"     : False,
       "quiet"          : False,
       "write_all"      : False,
+      "stream"         : False,
+      "segments"       : False,
+      "num_jobs"       : 1,
    }
    for opt, arg in opts:
       if opt == '-h':
@@ -76,6 +88,17 @@ def get_configuration(sys_argv):
       elif opt == '-a':
          config["write_all"] = True
          config["quiet"] = True
+      elif opt == '-f':
+         config["stream"] = True
+         config["write"] = True
+      elif opt == '-c':
+         config["segments"] = True
+         config["write"] = True
+      elif opt == '-j':
+         config["num_jobs"] = max(int(arg), 1)
+   if config["stream"] and config["segments"]:
+      print "-f and -c can't be used together"
+      sys.exit(2)
    #By default, write to file
    actions = ["write", "preview", "save_image"]
    if not any([config[key] for key in actions]):
@@ -96,20 +119,78 @@ def handle_scene(scene, **config):
    if config["quiet"]:
       curr_stdout = sys.stdout
       sys.stdout = open(os.devnull, "w")
-      
-   if config["preview"]:
-      scene.preview()
-   if config["save_image"]:
-      if not config["write_all"]:
-         scene.show_frame()
-      path = os.path.join(MOVIE_DIR, config["movie_prefix"])
-      scene.save_image(path, name)
-   if config["write"]:
-      scene.write_to_movie(os.path.join(config["movie_prefix"], name))
+   try:
+      if config["preview"]:
+         scene.preview()
+      if config["save_image"]:
+         if not config["write_all"]:
+            scene.show_frame()
+         path = os.path.join(MOVIE_DIR, config["movie_prefix"])
+         scene.save_image(path, name)
+      if config["write"] and not (config["stream"] or config["segments"]):
+         scene.write_to_movie(os.path.join(config["movie_prefix"], name))
+   finally:
+      if config["quiet"]:
+         sys.stdout.close()
+         sys.stdout = curr_stdout
 
-   if config["quiet"]:
-      sys.stdout.close()
-      sys.stdout = curr_stdout
+def render_scene(SceneClass, args, scene_kwargs, config):
+   """
+   Returns the scene's name, how long it took to render,
+   and the traceback as a string if it failed (None otherwise)
+   """
+   scene_kwargs = dict(scene_kwargs)
+   scene_kwargs["construct_args"] = tuplify(args)
+   name = SceneClass.__name__ + \
+          SceneClass.args_to_string(*scene_kwargs["construct_args"])
+   start_time = time.time()
+   try:
+      handle_scene(SceneClass(**scene_kwargs), **config)
+      error = None
+   except:
+      error = traceback.format_exc()
+   return name, time.time() - start_time, error
+
+#Filled in before the worker pool forks, so that
+#workers only need to be sent an index into it
+RENDER_JOBS = []
+
+def render_job(index):
+   result = render_scene(*RENDER_JOBS[index])
+   #Pool workers skip atexit handlers
+   save_tex_cache_index()
+   return result
+
+def init_worker():
+   #Let the parent process handle Ctrl-C
+   signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+def render_in_parallel(num_jobs):
+   pool = mp.Pool(num_jobs, init_worker)
+   try:
+      #Waiting with a timeout keeps the parent responsive to Ctrl-C
+      results = pool.map_async(
+         render_job, range(len(RENDER_JOBS)), chunksize = 1
+      ).get(sys.maxint)
+   except KeyboardInterrupt:
+      pool.terminate()
+      pool.join()
+      raise
+   pool.close()
+   pool.join()
+   return results
+
+def print_error(name, error):
+   print "\n\n"
+   print "%s failed:"%name
+   print error
+   print "\n\n"
+
+def print_summary(results, total_time):
+   print "\nRendered %d scene(s) in %.1fs"%(len(results), total_time)
+   for name, run_time, error in results:
+      status = "FAILED" if error else "ok"
+      print "%8.1fs  %-6s %s"%(run_time, status, name)
 
 def is_scene(obj):
    if not inspect.isclass(obj):
@@ -196,17 +277,34 @@ def main():
    )
    config["movie_prefix"] = config["file"].replace(".py", "")
    scene_kwargs = {
-      "camera_config" : config["camera_config"]
+      "camera_config"   : config["camera_config"],
+      "stream_to_movie" : config["stream"],
+      "write_segments"  : config["segments"],
+      "movie_prefix"    : config["movie_prefix"],
    }
-   for SceneClass in get_scene_classes(scene_names_to_classes, config):
-      for args in get_scene_args(SceneClass, config):
-         scene_kwargs["construct_args"] = tuplify(args)
-         try:
-            handle_scene(SceneClass(**scene_kwargs), **config)
-         except:
-            print "\n\n"
-            traceback.print_exc()
-            print "\n\n"
+   RENDER_JOBS[:] = [
+      (SceneClass, args, scene_kwargs, config)
+      for SceneClass in get_scene_classes(scene_names_to_classes, config)
+      for args in get_scene_args(SceneClass, config)
+   ]
+   compile_tex_in_scenes(remove_list_redundancies([
+      job[0] for job in RENDER_JOBS
+   ]))
+   start_time = time.time()
+   if config["num_jobs"] > 1 and len(RENDER_JOBS) > 1:
+      results = render_in_parallel(config["num_jobs"])
+      for name, run_time, error in results:
+         if error:
+            print_error(name, error)
+   else:
+      results = []
+      for job in RENDER_JOBS:
+         results.append(render_scene(*job))
+         name, run_time, error = results[-1]
+         if error:
+            print_error(name, error)
+   if len(results) > 1:
+      print_summary(results, time.time() - start_time)
 
 
 if __name__ == "__main__":
@@ -16,6 +16,33 @@ def get_smooth_handle_points(points):
     dim = points.shape[1]    
     if num_handles < 1:
         return np.zeros((0, dim)), np.zeros((0, dim))
+    closed = is_closed(points)
+    #This is the b as in Ax = b, where we are solving for x,
+    #and A is represented using diag.  However, think of entries
+    #to x and b as being points in space, not numbers
+    b = np.zeros((2*num_handles, dim))
+    b[1::2] = 2*points[1:]
+    b[0] = points[0]
+    b[-1] = points[-1]
+    if closed:
+        b[0] = 2*points[0]
+        b[-1] = np.zeros(dim)
+    handle_pairs = get_smooth_handle_solver(num_handles, closed)(b)
+    return handle_pairs[0::2], handle_pairs[1::2]
+
+#Keyed by (num_handles, closed)
+SMOOTH_HANDLE_SOLVERS = {}
+
+def get_smooth_handle_solver(num_handles, closed):
+    """
+    Returns a function solving, for all dimensions at once, the
+    equations for handles in get_smooth_handle_points.  As these
+    only depend on the number of handles, and whether the path is 
+    closed, each solver is made once.
+    """
+    key = (num_handles, closed)
+    if key in SMOOTH_HANDLE_SOLVERS:
+        return SMOOTH_HANDLE_SOLVERS[key]
     #Must solve 2*num_handles equations to get the handles.
     #l and u are the number of lower an upper diagonal rows
     #in the matrix to solve.
@@ -33,31 +60,54 @@ def get_smooth_handle_points(points):
     #last
     diag[2,-2] = -1
     diag[1,-1] = 2
-    #This is the b as in Ax = b, where we are solving for x,
-    #and A is represented using diag.  However, think of entries
-    #to x and b as being points in space, not numbers
-    b = np.zeros((2*num_handles, dim))
-    b[1::2] = 2*points[1:]
-    b[0] = points[0]
-    b[-1] = points[-1]
-    solve_func = lambda b : linalg.solve_banded(
-        (l, u), diag, b
-    )
-    if is_closed(points):
-        #Get equations to relate first and last points
-        matrix = diag_to_matrix((l, u), diag)
-        #last row handles second derivative
-        matrix[-1, [0, 1, -2, -1]] = [2, -1, 1, -2]
-        #first row handles first derivative
-        matrix[0,:] = np.zeros(matrix.shape[1])
-        matrix[0,[0, -1]] = [1, 1]
-        b[0] = 2*points[0]
-        b[-1] = np.zeros(dim)
-        solve_func = lambda b : linalg.solve(matrix, b)
-    handle_pairs = np.zeros((2*num_handles, dim))
-    for i in range(dim):
-        handle_pairs[:,i] = solve_func(b[:,i])
-    return handle_pairs[0::2], handle_pairs[1::2]
+    if not closed:
+        solver = lambda b : linalg.solve_banded((l, u), diag, b)
+    else:
+        solver = get_closed_smooth_handle_solver(l, u, diag)
+    SMOOTH_HANDLE_SOLVERS[key] = solver
+    return solver
+
+def get_closed_smooth_handle_solver(l, u, diag):
+    """
+    For closed paths, the first and last equations relate the
+    first and last handles, which puts four entries outside the 
+    band of diag.  Those in the band are set in diag, and the others
+    are treated as a rank 2 correction, using the Woodbury formula,
+    so that solving stays linear.  Falls back on a dense 
+    factorization if the banded part is singular.
+    """
+    size = diag.shape[1]
+    if size >= 6:
+        #Rows as in the dense matrix below, within the band
+        band_diag = np.array(diag)
+        band_diag[1,0], band_diag[0,1] = 1, 0
+        band_diag[1,-1], band_diag[2,-2] = -2, 1
+        #The full matrix is band_diag plus np.dot(U, V.T)
+        U = np.zeros((size, 2))
+        U[0,0], U[-1,1] = 1, 1
+        V = np.zeros((size, 2))
+        V[-1,0] = 1
+        V[[0, 1],1] = [2, -1]
+        try:
+            Z = linalg.solve_banded((l, u), band_diag, U)
+            capacitance = np.identity(2) + np.dot(V.T, Z)
+            if np.linalg.cond(capacitance) < 1e12:
+                correction = np.dot(Z, np.linalg.inv(capacitance))
+                def solver(b):
+                    y = linalg.solve_banded((l, u), band_diag, b)
+                    return y - np.dot(correction, np.dot(V.T, y))
+                return solver
+        except np.linalg.LinAlgError:
+            pass
+    #Get equations to relate first and last points
+    matrix = diag_to_matrix((l, u), diag)
+    #last row handles second derivative
+    matrix[-1, [0, 1, -2, -1]] = [2, -1, 1, -2]
+    #first row handles first derivative
+    matrix[0,:] = np.zeros(matrix.shape[1])
+    matrix[0,[0, -1]] = [1, 1]
+    lu_and_piv = linalg.lu_factor(matrix)
+    return lambda b : linalg.lu_solve(lu_and_piv, b)
 
 def diag_to_matrix(l_and_u, diag):
     """
@@ -117,18 +167,33 @@ def bezier(points):
         for point, k in zip(points, it.count())
     ])
 
+def get_slices(arrays):
+    """
+    The slices of np.concatenate(arrays) where each array ended up
+    """
+    ends = np.cumsum(map(len, arrays))
+    return map(slice, [0] + list(ends[:-1]), ends)
+
 def remove_list_redundancies(l):
     """
     Used instead of list(set(l)) to maintain order
     """
-    return sorted(list(set(l)), lambda a, b : l.index(a) - l.index(b))
+    result = []
+    used = set()
+    for x in l:
+        if x not in used:
+            result.append(x)
+            used.add(x)
+    return result
 
 def list_update(l1, l2):
     """
     Used instead of list(set(l1).update(l2)) to maintain order,
     making sure duplicates are removed from l1, not l2.
     """
-    return filter(lambda e : e not in l2, l1) + list(l2)
+    l2 = list(l2)
+    l2_set = set(l2)
+    return filter(lambda e : e not in l2_set, l1) + l2
 
 def all_elements_are_instances(iterable, Class):
     return all(map(lambda e : isinstance(e, Class), iterable))
@@ -302,6 +367,17 @@ def cammel_case_initials(name):
 
 ################################################
 
+def run_length_encode(objects):
+    """
+    Collapses consecutive repeats of the same object
+    (by identity) into a list of (object, count) pairs
+    """
+    result = []
+    for key, group in it.groupby(objects, id):
+        group = list(group)
+        result.append((group[0], len(group)))
+    return result
+
 def drag_pixels(frames):
     curr = frames[0]
     new_frames = []
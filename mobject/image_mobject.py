@@ -1,6 +1,7 @@
 import numpy as np
 import itertools as it
 import os
+import hashlib
 from PIL import Image
 from random import random
 
@@ -16,6 +17,10 @@ class ImageMobject(PMobject):
         "filter_color"    : "black",
         "invert"          : True,
         "use_cache"       : True,
+        #Colors in images are bytes, so this is lossless, but the
+        #colors of each instance are then converted rather than 
+        #sharing pages of the cache file, as points do
+        "cache_rgbs_as_uint8" : True,
         "stroke_width" : 1,
         "scale_value"     : 1.0,
         "should_center"   : True,
@@ -36,47 +41,75 @@ class ImageMobject(PMobject):
         for path in possible_paths:
             if os.path.exists(path):
                 self.generate_points_from_file(path)
-                self.scale(self.scale_value)
-                if self.should_center:
-                    self.center()
                 return
         raise IOError("File not Found")
                 
     def generate_points_from_file(self, path):
-        if self.use_cache and self.read_in_cached_attrs(path):
-            return
+        """
+        Points are cached as they are after scaling and centering,
+        so that cached arrays are used as they are
+        """
+        if self.use_cache:
+            cache_key = self.get_cache_key(path)
+            if self.read_in_cached_attrs(cache_key):
+                return
         image = Image.open(path).convert('RGB')
         if self.invert:
             image = invert_image(image)
         self.generate_points_from_image_array(np.array(image))
-        self.cache_attrs(path)
+        if self.scale_value != 1:
+            self.scale(self.scale_value)
+        if self.should_center:
+            self.center()
+        if self.use_cache:
+            self.cache_attrs(cache_key)
+
+    def get_cache_key(self, path):
+        """
+        Stable across processes, and changes with the
+        image's contents or any setting which affects points
+        """
+        with open(path, "rb") as image_file:
+            contents = image_file.read()
+        return hashlib.sha1(contents + repr((
+            self.invert, str(self.filter_color), 
+            self.scale_value, self.should_center,
+            self.cache_rgbs_as_uint8, str(self.point_dtype),
+        ))).hexdigest()
 
-    def get_cached_attr_files(self, path, attrs):
-        #Hash should be unique to (path, invert) pair
-        unique_hash = str(hash(path+str(self.invert)))
+    def get_cached_attr_files(self, cache_key, attrs):
         return [
-            os.path.join(IMAGE_MOBJECT_DIR, unique_hash)+"."+attr
+            os.path.join(IMAGE_MOBJECT_DIR, cache_key)+"."+attr+".npy"
             for attr in attrs
         ]
 
-    def read_in_cached_attrs(self, path, 
-                             attrs = ("points", "rgbs"), 
-                             dtype = "float64"):
-        cached_attr_files = self.get_cached_attr_files(path, attrs)
-        if all(map(os.path.exists, cached_attr_files)):
-            for attr, cache_file in zip(attrs, cached_attr_files):
-                arr = np.fromfile(cache_file, dtype = dtype)
-                arr = arr.reshape(arr.size/self.DIM, self.DIM)
-                setattr(self, attr, arr)
-            return True
-        return False
-
-    def cache_attrs(self, path, 
-                    attrs = ("points", "rgbs"),
-                    dtype = "float64"):
-        cached_attr_files = self.get_cached_attr_files(path, attrs)
+    def read_in_cached_attrs(self, cache_key, attrs = ("points", "rgbs")):
+        """
+        Arrays are memory mapped copy-on-write, so instances of 
+        one image share pages until they change them
+        """
+        cached_attr_files = self.get_cached_attr_files(cache_key, attrs)
+        if not all(map(os.path.exists, cached_attr_files)):
+            return False
+        for attr, cache_file in zip(attrs, cached_attr_files):
+            arr = np.load(cache_file, mmap_mode = "c")
+            if arr.dtype == np.dtype('uint8'):
+                arr = arr / 255.0
+            setattr(self, attr, arr)
+        return True
+
+    def cache_attrs(self, cache_key, attrs = ("points", "rgbs")):
+        cached_attr_files = self.get_cached_attr_files(cache_key, attrs)
         for attr, cache_file in zip(attrs, cached_attr_files): 
-            getattr(self, attr).astype(dtype).tofile(cache_file)
+            arr = getattr(self, attr)
+            if attr == "rgbs" and self.cache_rgbs_as_uint8:
+                arr = np.round(255*arr).astype('uint8')
+            #Written under another name first, so that a cache 
+            #file is never read while partly written
+            partial_file = cache_file + ".partial"
+            with open(partial_file, "wb") as outfile:
+                np.save(outfile, arr)
+            os.rename(partial_file, cache_file)
 
 
     def generate_points_from_image_array(self, image_array):
@@ -1,6 +1,7 @@
 import numpy as np
 import operator as op
 import os
+import types
 from PIL import Image
 from copy import deepcopy
 from colour import Color
@@ -8,6 +9,95 @@ from colour import Color
 from helpers import *
 
 
+#Attribute values of these types are shared between copies.
+#Colors are included since they are replaced, never modified.
+SHARED_ATTRIBUTE_TYPES = (
+    bool, int, long, float, complex, str, unicode, type(None), 
+    np.number, type, types.FunctionType, Color,
+)
+SHARED_ATTRIBUTE_TYPE_SET = set(SHARED_ATTRIBUTE_TYPES)
+
+def copy_attribute(value, memo):
+    #Exact type lookups first, as this runs for every attribute
+    value_type = type(value)
+    if value_type in SHARED_ATTRIBUTE_TYPE_SET:
+        return value
+    if value_type is np.ndarray:
+        return value.copy()
+    if isinstance(value, SHARED_ATTRIBUTE_TYPES):
+        return value
+    if isinstance(value, np.ndarray):
+        return np.array(value)
+    if isinstance(value, SubmobjectList):
+        return SubmobjectList([copy_attribute(elem, memo) for elem in value])
+    if isinstance(value, list):
+        return [copy_attribute(elem, memo) for elem in value]
+    if isinstance(value, Mobject):
+        if id(value) in memo:
+            return memo[id(value)]
+        return value.__deepcopy__(memo)
+    return deepcopy(value, memo)
+
+#Bumped whenever any mobject's list of submobjects changes, which
+#invalidates every cached submobject_family.  A single count is
+#kept, rather than one per mobject, since a change to one tree
+#changes the family of everything above it.  The hits and misses
+#are only there to see how well the cache does.
+FAMILY_CACHE_STATS = {
+    "tree_version" : 0,
+    "hits"         : 0,
+    "misses"       : 0,
+}
+
+def note_tree_change():
+    FAMILY_CACHE_STATS["tree_version"] += 1
+
+def get_family_cache_hit_rate():
+    lookups = FAMILY_CACHE_STATS["hits"] + FAMILY_CACHE_STATS["misses"]
+    if lookups == 0:
+        return 0.0
+    return float(FAMILY_CACHE_STATS["hits"]) / lookups
+
+def noting_tree_change(method):
+    def wrapper(self, *args, **kwargs):
+        note_tree_change()
+        return method(self, *args, **kwargs)
+    wrapper.__name__ = method.__name__
+    return wrapper
+
+class SubmobjectList(list):
+    """
+    List which calls note_tree_change whenever it's modified in place,
+    as with mobject.submobjects.remove(...) or submobjects[1] = ...
+    """
+    for name in [
+        "__setitem__", "__delitem__", "__setslice__", "__delslice__",
+        "__iadd__", "__imul__", "append", "extend", "insert", 
+        "pop", "remove", "reverse", "sort",
+        ]:
+        locals()[name] = noting_tree_change(getattr(list, name))
+    del name
+
+class PointArray(object):
+    """
+    Attribute, such as points, holding an array which is always
+    stored with its mobject's point_dtype
+    """
+    def __init__(self, name):
+        self.name = name
+
+    def __get__(self, mobject, owner):
+        if mobject is None:
+            return self
+        try:
+            return mobject.__dict__[self.name]
+        except KeyError:
+            raise AttributeError(self.name)
+
+    def __set__(self, mobject, value):
+        dtype = getattr(mobject, "point_dtype", DEFAULT_POINT_DTYPE)
+        mobject.__dict__[self.name] = np.asarray(value, dtype = dtype)
+
 #TODO: Explain array_attrs
 
 class Mobject(object):
@@ -21,7 +111,8 @@ class Mobject(object):
         "stroke_width" : DEFAULT_POINT_THICKNESS,
         "name"         : None,
         "dim"          : 3,
-        "target"       : None
+        "target"       : None,
+        "point_dtype"  : DEFAULT_POINT_DTYPE,
     }
     def __init__(self, *submobjects, **kwargs):
         digest_config(self, kwargs)
@@ -36,6 +127,29 @@ class Mobject(object):
     def __str__(self):
         return self.name
 
+    def get_submobjects(self):
+        try:
+            return self.__dict__["submobjects"]
+        except KeyError:
+            raise AttributeError("submobjects")
+
+    def set_submobjects(self, submobjects):
+        note_tree_change()
+        self.__dict__["submobjects"] = SubmobjectList(submobjects)
+
+    submobjects = property(get_submobjects, set_submobjects)
+    points = PointArray("points")
+
+    def set_point_dtype(self, dtype, family = True):
+        """
+        Points are converted, and kept, in this dtype from now on
+        """
+        mobjects = self.submobject_family() if family else [self]
+        for mob in mobjects:
+            mob.point_dtype = dtype
+            mob.points = mob.points
+        return self
+
     def init_points(self):
         self.points = np.zeros((0, self.dim))
 
@@ -93,6 +207,22 @@ class Mobject(object):
     def copy(self):
         return deepcopy(self)
 
+    def __deepcopy__(self, memo):
+        """
+        Copies the submobject tree and every array, but shares 
+        immutable attributes rather than walking them as deepcopy
+        would.  As with deepcopy, references between mobjects in 
+        the tree point to their copies.
+        """
+        result = self.__class__.__new__(self.__class__)
+        memo[id(self)] = result
+        result.__dict__.update([
+            (key, copy_attribute(value, memo))
+            for key, value in self.__dict__.items()
+            if key != "family_cache"
+        ])
+        return result
+
     #### Transforming operations ######
 
     def apply_to_family(self, func):
@@ -127,9 +257,17 @@ class Mobject(object):
             mob.points[:,dim] *= factor
         return self
 
-    def apply_function(self, function):
+    def apply_function(self, function, vectorized = False):
+        """
+        function maps a point to a point.  If vectorized, it instead
+        takes the whole array of points, one per row, and returns
+        the new array.
+        """
         for mob in self.nonempty_family_members():
-            mob.points = np.apply_along_axis(function, 1, mob.points)
+            if vectorized:
+                mob.points = np.array(function(mob.points), dtype = 'float')
+            else:
+                mob.points = np.apply_along_axis(function, 1, mob.points)
         return self
 
     def wag(self, direction = RIGHT, axis = DOWN, wag_factor = 1.0):
@@ -298,10 +436,22 @@ class Mobject(object):
     ##
 
 
-    def apply_complex_function(self, function):
-        return self.apply_function(
-            lambda (x, y, z) : complex_to_R3(function(complex(x, y)))
-        )
+    def apply_complex_function(self, function, vectorized = False):
+        """
+        If vectorized, function is called once on the array
+        of complex numbers for the points
+        """
+        if not vectorized:
+            return self.apply_function(
+                lambda (x, y, z) : complex_to_R3(function(complex(x, y)))
+            )
+        for mob in self.nonempty_family_members():
+            zs = mob.points[:,0] + 1j*mob.points[:,1]
+            results = np.asarray(function(zs))
+            mob.points = np.zeros(mob.points.shape)
+            mob.points[:,0] = results.real
+            mob.points[:,1] = results.imag
+        return self
 
     def reduce_across_dimension(self, points_func, reduce_func, dim):
         try:
@@ -331,6 +481,14 @@ class Mobject(object):
     def get_num_points(self):
         return len(self.points)
 
+    def get_render_state(self):
+        """
+        Everything about this mobject which affects how the camera
+        draws it, so that comparing states from one frame to the
+        next tells whether it needs to be redrawn.
+        """
+        return (self.points.shape, self.points.tostring())
+
     def get_critical_point(self, direction):
         result = np.zeros(self.dim)
         for dim in [0, 1]:
@@ -399,16 +557,35 @@ class Mobject(object):
         return result + self.submobjects
 
     def submobject_family(self):
-        sub_families = map(Mobject.submobject_family, self.submobjects)
-        all_mobjects = [self] + reduce(op.add, sub_families, [])
-        return remove_list_redundancies(all_mobjects)
+        return list(self.get_cached_family())
 
     def nonempty_family_members(self):
         return filter(
             lambda m : m.get_num_points() > 0, 
-            self.submobject_family()
+            self.get_cached_family()
         )
 
+    def get_cached_family(self):
+        """
+        The list returned is shared, so shouldn't be modified.
+        It's good until any submobject list changes.
+        """
+        tree_version = FAMILY_CACHE_STATS["tree_version"]
+        if "family_cache" in self.__dict__:
+            version, family = self.family_cache
+            if version == tree_version:
+                FAMILY_CACHE_STATS["hits"] += 1
+                return family
+        FAMILY_CACHE_STATS["misses"] += 1
+        family = remove_list_redundancies(list(it.chain(
+            [self], *[
+                submob.get_cached_family()
+                for submob in self.submobjects
+            ]
+        )))
+        self.family_cache = (tree_version, family)
+        return family
+
     def arrange_submobjects(self, 
                             direction = RIGHT, 
                             buff = DEFAULT_MOBJECT_TO_MOBJECT_BUFFER, 
@@ -5,18 +5,30 @@ class PMobject(Mobject):
     def init_points(self):
         self.rgbs = np.zeros((0, 3))
         self.points = np.zeros((0, 3))
+        #Opacity of each point, or None when all are opaque
+        self.alphas = None
         return self
 
     def get_array_attrs(self):
-        return Mobject.get_array_attrs(self) + ["rgbs"]
+        result = Mobject.get_array_attrs(self) + ["rgbs"]
+        if self.alphas is not None:
+            result.append("alphas")
+        return result
 
-    def add_points(self, points, rgbs = None, color = None):
+    def add_points(self, points, rgbs = None, color = None, alphas = None):
         """
-        points must be a Nx3 numpy array, as must rgbs if it is not None
+        points must be a Nx3 numpy array, as must rgbs if it is not None.
+        alphas, if not None, must hold one opacity per point.
         """
         if not isinstance(points, np.ndarray):
             points = np.array(points)
         num_new_points = points.shape[0]
+        if alphas is not None or self.alphas is not None:
+            if alphas is None:
+                alphas = np.ones(num_new_points)
+            elif len(alphas) != num_new_points:
+                raise Exception("points and alphas must have same length")
+            self.alphas = np.append(self.get_alphas(), alphas)
         self.points = np.append(self.points, points, axis = 0)
         if rgbs is None:
             color = Color(color) if color else self.color
@@ -26,11 +38,35 @@ class PMobject(Mobject):
         self.rgbs = np.append(self.rgbs, rgbs, axis = 0)
         return self
 
-    def highlight(self, color = YELLOW_C, condition = None):
+    def get_alphas(self):
+        if self.alphas is None:
+            return np.ones(self.get_num_points())
+        return self.alphas
+
+    def set_alphas(self, alphas):
+        """
+        alphas is either one opacity for every point, or one per point
+        """
+        for mob in self.nonempty_family_members():
+            mob.alphas = np.ones(mob.get_num_points())*alphas
+        return self
+
+    def apply_to_points(self, function, vectorized = False):
+        """
+        Array of function evaluated at each point.  If vectorized,
+        function instead takes the whole array of points, one per
+        row.
+        """
+        if vectorized:
+            return np.asarray(function(self.points))
+        return np.apply_along_axis(function, 1, self.points)
+
+    def highlight(self, color = YELLOW_C, condition = None, 
+                  vectorized = False):
         rgb = Color(color).get_rgb()
         for mob in self.nonempty_family_members():
             if condition:
-                to_change = np.apply_along_axis(condition, 1, mob.points)
+                to_change = mob.apply_to_points(condition, vectorized)
                 mob.rgbs[to_change, :] = rgb
             else:
                 mob.rgbs[:,:] = rgb
@@ -43,10 +79,10 @@ class PMobject(Mobject):
         ]
         for mob in self.nonempty_family_members():
             num_points = mob.get_num_points()
-            mob.rgbs = np.array([
-                interpolate(start_rgb, end_rgb, alpha)
-                for alpha in np.arange(num_points)/float(num_points)
-            ])
+            alphas = np.arange(num_points)/float(num_points)
+            mob.rgbs = interpolate(
+                start_rgb, end_rgb, alphas.reshape((num_points, 1))
+            )
         return self
 
 
@@ -55,11 +91,10 @@ class PMobject(Mobject):
         self.rgbs = np.array(mobject.rgbs)
         return self
 
-    def filter_out(self, condition):
+    def filter_out(self, condition, vectorized = False):
         for mob in self.nonempty_family_members():
-            to_eliminate = ~np.apply_along_axis(condition, 1, mob.points)
-            mob.points = mob.points[to_eliminate]
-            mob.rgbs = mob.rgbs[to_eliminate]
+            to_eliminate = ~mob.apply_to_points(condition, vectorized)
+            mob.apply_over_attr_arrays(lambda arr : arr[to_eliminate])
         return self
 
     def thin_out(self, factor = 5):
@@ -75,13 +110,13 @@ class PMobject(Mobject):
             )
         return self
 
-    def sort_points(self, function = lambda p : p[0]):
+    def sort_points(self, function = lambda p : p[0], vectorized = False):
         """
         function is any map from R^3 to R
         """
         for mob in self.nonempty_family_members():
             indices = np.argsort(
-                np.apply_along_axis(function, 1, mob.points)
+                mob.apply_to_points(function, vectorized)
             )
             mob.apply_over_attr_arrays(lambda arr : arr[indices])
         return self
@@ -95,17 +130,33 @@ class PMobject(Mobject):
     def get_all_rgbs(self):
         return self.get_merged_array("rgbs")
 
+    def get_all_alphas(self):
+        family = self.nonempty_family_members()
+        if all([mob.alphas is None for mob in family]):
+            return None
+        return np.concatenate([
+            mob.get_alphas() for mob in family
+        ])
+
     def ingest_submobjects(self):
-        attrs = self.get_array_attrs()
+        alphas = self.get_all_alphas()
+        attrs = ["points", "rgbs"]
         arrays = map(self.get_merged_array, attrs)
         for attr, array in zip(attrs, arrays):
             setattr(self, attr, array)
+        self.alphas = alphas
         self.submobjects = []
         return self
 
     def get_color(self):
         return Color(rgb = self.rgbs[0, :])
 
+    def get_render_state(self):
+        alphas = None if self.alphas is None else self.alphas.tostring()
+        return Mobject.get_render_state(self) + (
+            self.rgbs.tostring(), self.stroke_width, alphas
+        )
+
     def point_from_proportion(self, alpha):
         index = alpha*(self.get_num_points()-1)
         return self.points[index]
@@ -128,13 +179,20 @@ class PMobject(Mobject):
         self.rgbs = interpolate(
             mobject1.rgbs, mobject2.rgbs, alpha
         )
+        if mobject1.alphas is None and mobject2.alphas is None:
+            self.alphas = None
+        else:
+            self.alphas = interpolate(
+                mobject1.get_alphas(), mobject2.get_alphas(), alpha
+            )
 
     def become_partial(self, mobject, a, b):
         lower_index, upper_index = [
             int(x * mobject.get_num_points())
             for x in a, b
         ]
-        for attr in self.get_array_attrs():
+        self.alphas = None
+        for attr in mobject.get_array_attrs():
             full_array = getattr(mobject, attr)
             partial_array = full_array[lower_index:upper_index]
             setattr(self, attr, partial_array) 
@@ -7,7 +7,12 @@ from mobject import Mobject
 
 from helpers import *
 
-#TODO, this whole class should be something vectorized.
+#Numpy functions combining two boolean masks
+REGION_OPERATIONS = {
+    "union"     : np.logical_or,
+    "intersect" : np.logical_and,
+}
+
 class Region(Mobject):
     CONFIG = {
         "display_mode" : "region"
@@ -22,25 +27,63 @@ class Region(Mobject):
         """
         Mobject.__init__(self, **kwargs)
         self.condition = condition
+        #Applied, in order, to the mask of condition.  Each is
+        #a name from REGION_OPERATIONS with another region, or 
+        #("complement", None)
+        self.operations = []
+        self.version = 0
+        self.mask_cache = None
 
-    def _combine(self, region, op):
-        self.condition = lambda x, y : op(
-            self.condition(x, y),
-            region.condition(x, y)
-        )
+    def _combine(self, region, op_name):
+        self.operations.append((op_name, region))
+        self.version += 1
 
     def union(self, region):
-        self._combine(region, lambda bg1, bg2 : bg1 | bg2)
+        self._combine(region, "union")
         return self
 
     def intersect(self, region):
-        self._combine(region, lambda bg1, bg2 : bg1 & bg2)
+        self._combine(region, "intersect")
         return self
 
     def complement(self):
-        self.bool_grid = ~self.bool_grid
+        self._combine(None, "complement")
         return self
 
+    def get_versions(self):
+        """
+        Changes whenever this region, or any it was combined 
+        with, changes
+        """
+        return (self.version, tuple([
+            region.get_versions()
+            for op_name, region in self.operations
+            if region is not None
+        ]))
+
+    def get_mask(self, x_array, y_array, grid_key):
+        """
+        Boolean array of which points of the grid given by x_array
+        and y_array are in the region.  grid_key identifies that
+        grid, and the mask is kept until it or the region changes.
+        Masks of the regions combined into this one are cached
+        on those regions, so they can be shared.
+        """
+        key = (grid_key, self.get_versions())
+        if self.mask_cache is not None and self.mask_cache[0] == key:
+            return self.mask_cache[1]
+        mask = np.zeros(x_array.shape, dtype = 'bool')
+        mask[:] = self.condition(x_array, y_array)
+        for op_name, region in self.operations:
+            if op_name == "complement":
+                mask = np.logical_not(mask)
+            else:
+                mask = REGION_OPERATIONS[op_name](
+                    mask, region.get_mask(x_array, y_array, grid_key)
+                )
+        self.mask_cache = (key, mask)
+        return mask
+
 class HalfPlane(Region):
     def __init__(self, point_pair, upper_left = True, *args, **kwargs):
         """
@@ -68,26 +111,96 @@ def region_from_polygon_vertices(*vertices, **kwargs):
     return region_from_line_boundary(*adjascent_pairs(vertices), **kwargs)
 
 
+def get_line_coefficients(lines):
+    """
+    Returns arrays a, b, c so that a*x + b*y - c is positive
+    exactly on the side of each line which HalfPlane(line) covers
+    """
+    starts = np.array([line[0][:2] for line in lines], dtype = 'float')
+    ends = np.array([line[1][:2] for line in lines], dtype = 'float')
+    a = starts[:,1] - ends[:,1]
+    b = ends[:,0] - starts[:,0]
+    c = a*starts[:,0] + b*starts[:,1]
+    return a, b, c
+
+def get_partition_radius(lines, a, b, c):
+    """
+    Half the side of a square, centered at the origin, containing
+    every point on the lines and every point where two lines meet
+    """
+    points = [np.array(point[:2]) for line in lines for point in line]
+    det = np.outer(a, b) - np.outer(b, a)
+    meet = np.abs(det) > 1e-10*(np.outer(np.abs(a), np.abs(b)) + \
+                                np.outer(np.abs(b), np.abs(a)))
+    if meet.any():
+        xs = (np.outer(c, b) - np.outer(b, c))[meet] / det[meet]
+        ys = (np.outer(a, c) - np.outer(c, a))[meet] / det[meet]
+        points += [xs, ys]
+    return 2*max(map(np.max, map(np.abs, points)) + [SPACE_WIDTH]) + 1
+
+def clip_convex_polygon(vertices, values):
+    """
+    The part of the convex polygon with the given vertices where
+    values, taken to be linear between vertices, are non-negative
+    """
+    result = []
+    num_vertices = len(vertices)
+    for i in range(num_vertices):
+        j = (i + 1) % num_vertices
+        if values[i] >= 0:
+            result.append(vertices[i])
+        if values[i]*values[j] < 0:
+            alpha = values[i] / (values[i] - values[j])
+            result.append(interpolate(vertices[i], vertices[j], alpha))
+    return np.array(result)
+
 def plane_partition(*lines, **kwargs):
     """
     A 'line' is a pair of points [(x0, y0,...), (x1, y1,...)]
 
     Returns the list of regions of the plane cut out by
     these lines
+
+    Cells are found by cutting a square containing every crossing
+    of lines, one line at a time, into convex polygons, so only
+    cells which exist are made.  Each region is the intersection 
+    of the half planes of those lines which cut its polygon, and
+    all regions share those half planes, and so their masks.
     """
-    result = []
     half_planes = [HalfPlane(line, **kwargs) for line in lines]
     complements = [deepcopy(hp).complement() for hp in half_planes]
-    num_lines = len(lines)
-    for bool_list in it.product(*[[True, False]]*num_lines):
+    if len(lines) == 0:
+        return [Region(**kwargs)]
+    a, b, c = get_line_coefficients(lines)
+    if not kwargs.get("upper_left", True):
+        a, b, c = -a, -b, -c
+    radius = get_partition_radius(lines, a, b, c)
+    square = radius*np.array([(1, 1), (-1, 1), (-1, -1), (1, -1)])
+    #Each cell is its polygon, with a list of (line index, side)
+    cells = [(square, [])]
+    for i in range(len(lines)):
+        new_cells = []
+        for vertices, sides in cells:
+            values = a[i]*vertices[:,0] + b[i]*vertices[:,1] - c[i]
+            #Vertices within tolerance are taken to be on the line
+            values[np.abs(values) < 1e-10*radius*radius] = 0
+            if (values > 0).any() and (values < 0).any():
+                new_cells += [
+                    (clip_convex_polygon(vertices, values), sides + [(i, True)]),
+                    (clip_convex_polygon(vertices, -values), sides + [(i, False)]),
+                ]
+            else:
+                new_cells.append((vertices, sides))
+        cells = new_cells
+    result = []
+    for vertices, sides in cells:
         reg = Region(**kwargs)
-        for i in range(num_lines):
-            if bool_list[i]:
+        for i, side in sides:
+            if side:
                 reg.intersect(half_planes[i])
             else:
                 reg.intersect(complements[i])
-        if reg.bool_grid.any():
-            result.append(reg)
+        result.append(reg)
     return result
 
 def plane_partition_from_points(*points, **kwargs):
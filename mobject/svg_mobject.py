@@ -1,5 +1,6 @@
 from xml.dom import minidom
 import warnings
+import hashlib
 
 from vectorized_mobject import VMobject
 from topics.geometry import Rectangle, Circle
@@ -9,6 +10,7 @@ class SVGMobject(VMobject):
     CONFIG = {
         "initial_scale_val" : 1,
         "should_center" : True,
+        "use_cache" : True,
     }
     def __init__(self, svg_file, **kwargs):
         digest_config(self, kwargs, locals())
@@ -16,11 +18,22 @@ class SVGMobject(VMobject):
         self.move_into_position()
 
     def generate_points(self):
+        if not self.use_cache:
+            self.parse_svg_file()
+            return
+        cache_key = self.get_cache_key()
+        if not self.read_in_cached_submobjects(cache_key):
+            self.parse_svg_file()
+            self.cache_submobjects(cache_key)
+
+    def parse_svg_file(self):
         doc = minidom.parse(self.svg_file)
         self.ref_to_element = {}
         for svg in doc.getElementsByTagName("svg"):
             self.add(*self.get_mobjects_from(svg))
         doc.unlink()
+        #Only needed while parsing, and costly to copy
+        del self.ref_to_element
 
     def get_mobjects_from(self, element):
         result = []
@@ -118,6 +131,115 @@ class SVGMobject(VMobject):
             self.center()
         self.scale_in_place(self.initial_scale_val)
 
+    ## Caching of parsed submobjects
+
+    def get_cache_key(self):
+        """
+        The class is part of the key, since subclasses may 
+        turn path strings into different types of mobject
+        """
+        with open(self.svg_file, "rb") as svg:
+            contents = svg.read()
+        return hashlib.sha1(
+            contents + self.__class__.__name__ + str(self.point_dtype)
+        ).hexdigest()
+
+    def get_cache_file(self, cache_key):
+        return os.path.join(SVG_MOBJECT_DIR, cache_key + ".npz")
+
+    def read_in_cached_submobjects(self, cache_key):
+        if cache_key not in PARSED_SVG_CACHE:
+            cache_file = self.get_cache_file(cache_key)
+            if not os.path.exists(cache_file):
+                return False
+            submobjects = self.submobjects_from_cache_data(
+                np.load(cache_file)
+            )
+            PARSED_SVG_CACHE[cache_key] = submobjects
+        self.add(*[
+            submob.copy()
+            for submob in PARSED_SVG_CACHE[cache_key]
+        ])
+        return True
+
+    def cache_submobjects(self, cache_key):
+        PARSED_SVG_CACHE[cache_key] = [
+            submob.copy()
+            for submob in self.submobjects
+        ]
+        data = self.get_cache_data()
+        if data is not None:
+            np.savez(self.get_cache_file(cache_key), **data)
+
+    def get_cache_data(self):
+        """
+        Returns a dict of arrays from which submobjects_from_cache_data
+        can rebuild this mobject's submobjects, or None if they have
+        structure which it does not know how to store.
+        """
+        data = {"kinds" : np.zeros(len(self.submobjects), dtype = 'int')}
+        path_strings = []
+        for index, submob in enumerate(self.submobjects):
+            suffix = "_%d"%index
+            data["points"+suffix] = submob.points
+            if isinstance(submob, VMobjectFromSVGPathstring):
+                data["kinds"][index] = PATH_KIND
+                path_strings.append(submob.get_original_path_string())
+                subpaths = submob.get_subpath_mobjects()
+                data["subpath_lengths"+suffix] = np.array([
+                    len(subpath.points) for subpath in subpaths
+                ], dtype = 'int')
+                data["subpath_points"+suffix] = np.concatenate(
+                    [np.zeros((0, self.dim))] + 
+                    [subpath.points for subpath in subpaths]
+                )
+            elif len(submob.submobjects) == 0:
+                data["kinds"][index] = SHAPE_KIND
+                path_strings.append("")
+                data["style"+suffix] = np.concatenate([
+                    submob.stroke_rgb, [submob.stroke_width],
+                    submob.fill_rgb, [submob.fill_opacity],
+                    [submob.mark_paths_closed],
+                ])
+            else:
+                return None
+        data["path_strings"] = np.array(path_strings)
+        return data
+
+    def submobjects_from_cache_data(self, data):
+        result = []
+        for index, kind in enumerate(data["kinds"]):
+            suffix = "_%d"%index
+            if kind == PATH_KIND:
+                submob = self.path_string_to_mobject("")
+                submob.path_string = str(data["path_strings"][index])
+                submob.set_points(data["points"+suffix])
+                lengths = data["subpath_lengths"+suffix]
+                subpath_points = np.split(
+                    data["subpath_points"+suffix], 
+                    np.cumsum(lengths)[:-1]
+                )
+                for points in subpath_points[:len(lengths)]:
+                    submob.add_subpath(points)
+            else:
+                style = data["style"+suffix]
+                submob = VMobject(
+                    mark_paths_closed = bool(style[8])
+                )
+                submob.set_points(data["points"+suffix])
+                submob.stroke_rgb = style[:3]
+                submob.stroke_width = style[3]
+                submob.fill_rgb = style[4:7]
+                submob.fill_opacity = style[7]
+            result.append(submob)
+        return result
+
+#In memory copies of parsed submobjects, keyed
+#in the same way as files in SVG_MOBJECT_DIR
+PARSED_SVG_CACHE = {}
+PATH_KIND, SHAPE_KIND = 1, 0
+
+
 
 
 
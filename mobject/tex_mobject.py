@@ -1,3 +1,15 @@
+import ast
+import atexit
+import glob
+import hashlib
+import json
+import time
+import inspect
+import multiprocessing as mp
+import subprocess as sp
+import textwrap
+from distutils.spawn import find_executable
+
 from vectorized_mobject import VMobject
 from svg_mobject import SVGMobject, VMobjectFromSVGPathstring
 from helpers import *
@@ -109,19 +121,36 @@ class Brace(TexMobject):
             mob.rotate(angle)
     
 def tex_hash(expression, template_tex_file):
-    return str(hash(expression + template_tex_file))
+    """
+    Digest of the expression together with the contents (not the 
+    path) of the template, so that cache entries are stable across
+    interpreters and machines
+    """
+    if template_tex_file not in TEMPLATE_CONTENTS:
+        with open(template_tex_file, "r") as infile:
+            TEMPLATE_CONTENTS[template_tex_file] = infile.read()
+    digest = hashlib.sha256(TEMPLATE_CONTENTS[template_tex_file])
+    digest.update(expression)
+    return digest.hexdigest()
 
-def tex_to_svg_file(expression, template_tex_file):
-    image_dir = os.path.join(
-        TEX_IMAGE_DIR, 
+TEMPLATE_CONTENTS = {}
+
+def get_tex_svg_file(expression, template_tex_file):
+    return os.path.join(
+        TEX_DIR, 
         tex_hash(expression, template_tex_file)
-    )
-    if os.path.exists(image_dir):
-        return get_sorted_image_list(image_dir)
-    tex_file = generate_tex_file(expression, template_tex_file)
-    dvi_file = tex_to_dvi(tex_file)
-    return dvi_to_svg(dvi_file)
+    )+".svg"
 
+def tex_to_svg_file(expression, template_tex_file):
+    svg_file = get_tex_svg_file(expression, template_tex_file)
+    if not os.path.exists(svg_file):
+        #If it does exist, it was either compiled on an earlier
+        #run, or filled in by compile_tex_batch
+        tex_file = generate_tex_file(expression, template_tex_file)
+        dvi_file = tex_to_dvi(tex_file)
+        dvi_to_svg(dvi_file)
+    record_tex_cache_access(tex_hash(expression, template_tex_file))
+    return svg_file
 
 def generate_tex_file(expression, template_tex_file):
     result = os.path.join(
@@ -176,15 +205,269 @@ def dvi_to_svg(dvi_file, regen_if_exists = False):
     return result
 
 
+## Batch compilation
 
+TEX_MOBJECT_CLASS_TEMPLATES = {
+    "TexMobject"  : TEMPLATE_TEX_FILE,
+    "TextMobject" : TEMPLATE_TEXT_FILE,
+}
 
+def get_tex_expressions_in_source(source):
+    """
+    Finds every TexMobject and TextMobject in the source
+    whose expression is a string literal (or list of them).  Returns
+    a dict mapping template files to lists of those expressions.
+    Expressions built at runtime are not found, and will simply 
+    be compiled on their own when they are first needed.
+    """
+    result = dict([
+        (template, []) 
+        for template in TEX_MOBJECT_CLASS_TEMPLATES.values()
+    ])
+    tree = ast.parse(source)
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.Call) or len(node.args) == 0:
+            continue
+        if isinstance(node.func, ast.Name):
+            class_name = node.func.id
+        elif isinstance(node.func, ast.Attribute):
+            class_name = node.func.attr
+        else:
+            continue
+        if class_name not in TEX_MOBJECT_CLASS_TEMPLATES:
+            continue
+        arg = node.args[0]
+        if isinstance(arg, ast.Str):
+            strings = [arg]
+        elif isinstance(arg, (ast.List, ast.Tuple)):
+            strings = arg.elts
+        else:
+            continue
+        result[TEX_MOBJECT_CLASS_TEMPLATES[class_name]] += [
+            string.s
+            for string in strings
+            if isinstance(string, ast.Str)
+        ]
+    return result
 
+def get_scene_source(scene_classes):
+    """
+    Source of the given scene classes, along with that of any
+    classes they inherit from in the same modules
+    """
+    classes = remove_list_redundancies(list(it.chain(*[
+        [
+            cls for cls in inspect.getmro(SceneClass)
+            if cls.__module__ == SceneClass.__module__
+        ]
+        for SceneClass in scene_classes
+    ])))
+    return "\n".join([
+        textwrap.dedent(inspect.getsource(cls))
+        for cls in classes
+    ])
+
+def compile_tex_in_scenes(scene_classes):
+    """
+    Batch compiles the literal tex expressions of the scenes about to
+    be rendered.  Without latex or dvisvgm nothing is done here, and 
+    each expression is left to be compiled, or fail, on its own.
+    """
+    if find_executable("latex") is None or find_executable("dvisvgm") is None:
+        return
+    source = get_scene_source(scene_classes)
+    for template, expressions in get_tex_expressions_in_source(source).items():
+        compile_tex_batch(expressions, template)
 
+def compile_tex_batch(expressions, template_tex_file):
+    """
+    Compiles every expression not already in the TEX_DIR cache as one
+    page of a single multi-page document, with one latex run, then
+    splits the dvi into the per-expression svg files that 
+    tex_to_svg_file looks for, using parallel dvisvgm processes.
+    """
+    expressions = [
+        expression 
+        for expression in remove_list_redundancies(expressions)
+        if not os.path.exists(
+            get_tex_svg_file(expression, template_tex_file)
+        )
+    ]
+    if len(expressions) < 2:
+        return
+    print "Compiling %d tex expressions in one batch"%len(expressions)
+    with open(template_tex_file, "r") as infile:
+        template = infile.read()
+    begin, end = "\\begin{document}", "\\end{document}"
+    preamble, rest = template.split(begin)
+    body, closing = rest.split(end)
+    pages = [
+        body.replace(TEX_TEXT_TO_REPLACE, expression)
+        for expression in expressions
+    ]
+    document = preamble + begin + \
+               "\n\\clearpage\n".join(pages) + \
+               end + closing
+    batch_name = "batch_" + tex_hash(document, template_tex_file)
+    batch_prefix = os.path.join(TEX_DIR, batch_name)
+    with open(batch_prefix + ".tex", "w") as outfile:
+        outfile.write(document)
+    dvi_file = tex_to_dvi(batch_prefix + ".tex")
+    page_files = dvi_pages_to_svgs(dvi_file, len(expressions))
+    if len(page_files) == len(expressions):
+        for expression, page_file in zip(expressions, page_files):
+            os.rename(
+                page_file, 
+                get_tex_svg_file(expression, template_tex_file)
+            )
+            record_tex_cache_access(
+                tex_hash(expression, template_tex_file)
+            )
+    else:
+        #Most likely an expression failed to compile, so leave
+        #every expression to be compiled on its own
+        for page_file in page_files:
+            os.remove(page_file)
+    for batch_file in glob.glob(batch_prefix + ".*"):
+        os.remove(batch_file)
+
+def dvi_pages_to_svgs(dvi_file, num_pages):
+    """
+    Splits pages 1 through num_pages of dvi_file into separate
+    svgs, spreading page ranges across processes.  Returns the
+    list of svg files which were produced, sorted by page.
+    """
+    prefix = dvi_file.replace(".dvi", "") + "_page"
+    num_processes = min(mp.cpu_count(), num_pages)
+    page_ranges = [
+        "%d-%d"%(pages[0], pages[-1])
+        for pages in np.array_split(
+            np.arange(1, num_pages+1), num_processes
+        )
+    ]
+    with open(os.devnull, "w") as devnull:
+        try:
+            processes = [
+                sp.Popen([
+                    "dvisvgm",
+                    dvi_file,
+                    "-n",
+                    "-v", "0",
+                    "-p", page_range,
+                    "-o", prefix + "%p.svg",
+                ], stdout = devnull, stderr = devnull)
+                for page_range in page_ranges
+            ]
+        except OSError:
+            #dvisvgm could not be run, so no pages are split
+            return []
+        for process in processes:
+            process.wait()
+    page_files = glob.glob(prefix + "*.svg")
+    return sorted(
+        page_files,
+        key = lambda f : int(f[len(prefix):-len(".svg")])
+    )
 
 
+## Cache index
 
+#Loaded lazily by get_tex_cache_index
+TEX_CACHE_INDEX = None
 
-
-
-
-
+def get_tex_cache_index():
+    """
+    Maps each tex_hash in TEX_DIR to the total size of its
+    files and the time it was last used
+    """
+    global TEX_CACHE_INDEX
+    if TEX_CACHE_INDEX is None:
+        TEX_CACHE_INDEX = read_tex_cache_index()
+        atexit.register(save_tex_cache_index)
+    return TEX_CACHE_INDEX
+
+def read_tex_cache_index():
+    try:
+        with open(TEX_CACHE_INDEX_FILE, "r") as infile:
+            return json.load(infile)
+    except (IOError, ValueError):
+        return {}
+
+def get_tex_cache_files(key):
+    return filter(os.path.exists, [
+        os.path.join(TEX_DIR, key) + extension
+        for extension in ".tex", ".dvi", ".svg", ".log", ".aux"
+    ])
+
+def record_tex_cache_access(key):
+    index = get_tex_cache_index()
+    if key not in index:
+        index[key] = {
+            "size" : sum(map(os.path.getsize, get_tex_cache_files(key)))
+        }
+    index[key]["last_access"] = time.time()
+
+def write_tex_cache_index(index):
+    temp_file = TEX_CACHE_INDEX_FILE + ".%d"%os.getpid()
+    with open(temp_file, "w") as outfile:
+        json.dump(index, outfile)
+    os.rename(temp_file, TEX_CACHE_INDEX_FILE)
+
+def save_tex_cache_index():
+    """
+    Merges this process's accesses into the index on disk, as other
+    processes may have written to it since it was read, then
+    prunes the cache if it has grown past TEX_CACHE_MAX_SIZE.
+    """
+    if TEX_CACHE_INDEX is None:
+        return
+    index = read_tex_cache_index()
+    for key, entry in TEX_CACHE_INDEX.items():
+        last_access = index.get(key, {}).get("last_access", 0)
+        if entry["last_access"] > last_access:
+            index[key] = entry
+    TEX_CACHE_INDEX.update(index)
+    write_tex_cache_index(index)
+    total_size = sum([entry["size"] for entry in index.values()])
+    if TEX_CACHE_MAX_SIZE is not None and total_size > TEX_CACHE_MAX_SIZE:
+        prune_tex_cache()
+
+def prune_tex_cache(max_size = None):
+    """
+    Deletes least recently used entries of TEX_DIR until the 
+    total size is at most max_size bytes (TEX_CACHE_MAX_SIZE by
+    default).  Files missing from the index, such as those written
+    under an older tex_hash, count as last used when modified.
+    """
+    if max_size is None:
+        max_size = TEX_CACHE_MAX_SIZE
+    index = get_tex_cache_index()
+    entries = {}
+    for file_name in os.listdir(TEX_DIR):
+        path = os.path.join(TEX_DIR, file_name)
+        key = file_name.split(".")[0]
+        if path.startswith(TEX_CACHE_INDEX_FILE) or os.path.isdir(path):
+            continue
+        if key not in entries:
+            entries[key] = {"size" : 0, "last_access" : 0}
+        entries[key]["size"] += os.path.getsize(path)
+        entries[key]["last_access"] = max(
+            entries[key]["last_access"],
+            index.get(key, {}).get("last_access", os.path.getmtime(path))
+        )
+    total_size = sum([entry["size"] for entry in entries.values()])
+    num_removed = 0
+    keys = sorted(entries, key = lambda k : entries[k]["last_access"])
+    for key in keys:
+        if max_size is None or total_size <= max_size:
+            break
+        for path in glob.glob(os.path.join(TEX_DIR, key) + ".*"):
+            os.remove(path)
+        total_size -= entries.pop(key)["size"]
+        num_removed += 1
+    index.clear()
+    index.update(entries)
+    write_tex_cache_index(index)
+    print "Removed %d tex cache entries, %.1f MB remain"%(
+        num_removed, total_size / float(2**20)
+    )
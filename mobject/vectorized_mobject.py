@@ -93,6 +93,22 @@ class VMobject(Mobject):
         except:
             return Color(WHITE)
 
+    def get_render_state(self):
+        style = [
+            getattr(self, attr, None)
+            for attr in [
+                "stroke_rgb", "stroke_width", "fill_rgb", "fill_opacity"
+            ]
+        ]
+        return Mobject.get_render_state(self) + tuple([
+            value.tostring() if isinstance(value, np.ndarray) else value
+            for value in style
+        ]) + (self.mark_paths_closed, self.is_subpath) + tuple([
+            #Subpaths are drawn as part of this mobject's path
+            Mobject.get_render_state(subpath)
+            for subpath in self.get_subpath_mobjects()
+        ])
+
     #TODO, get color?  Specify if stroke or fill
     #is the predominant color attribute?
 
@@ -0,0 +1,22 @@
+import sys
+
+from constants import TEX_CACHE_MAX_SIZE
+from mobject.tex_mobject import prune_tex_cache
+
+HELP_MESSAGE = """
+   Usage:
+   python prune_tex_cache.py [<max megabytes>]
+
+   Removes least recently used compiled tex until the cache 
+   fits in the given size (TEX_CACHE_MAX_SIZE by default)
+"""
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] in ["-h", "--help"]:
+        print HELP_MESSAGE
+        sys.exit()
+    if len(sys.argv) > 1:
+        max_size = int(float(sys.argv[1])*(2**20))
+    else:
+        max_size = TEX_CACHE_MAX_SIZE
+    prune_tex_cache(max_size)
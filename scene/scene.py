@@ -8,6 +8,7 @@ import os
 import copy
 from tqdm import tqdm as ProgressDisplay
 import inspect
+import hashlib
 import subprocess as sp
 
 from helpers import *
@@ -21,15 +22,51 @@ class Scene(object):
         "camera_config"  : {},
         "frame_duration" : DEFAULT_FRAME_DURATION,
         "construct_args" : [],
+        #When True, frames are piped to ffmpeg as they are
+        #rendered, and only the most recent frame_buffer_size
+        #frames are kept in self.frames
+        "stream_to_movie"   : False,
+        "movie_prefix"      : "",
+        "frame_buffer_size" : DEFAULT_FRAME_BUFFER_SIZE,
+        #When True, each play and dither is written to its own movie 
+        #segment, cached by a hash of everything it renders, and the
+        #segments are joined into one movie once the scene is done.
+        #Not to be combined with stream_to_movie.
+        "write_segments"    : False,
+        #Number of images of the mobjects held still during a play 
+        #call which are kept, so that later calls over the same 
+        #unchanged mobjects needn't draw them again
+        "static_image_cache_size" : 4,
     }
     def __init__(self, **kwargs):
         digest_config(self, kwargs)
+        if self.stream_to_movie and self.write_segments:
+            #Segments are written through the same movie process
+            raise Exception(
+                "stream_to_movie and write_segments can't both be set"
+            )
         self.camera = Camera(**self.camera_config)
         self.frames = []
         self.mobjects = []
         self.num_animations = 0
-
-        self.construct(*self.construct_args)
+        self.num_flushed_frames = 0
+        self.movie_process = None
+        self.segment_files = []
+        self.static_image_cache = []
+
+        if self.stream_to_movie:
+            self.open_movie_pipe(
+                os.path.join(self.movie_prefix, str(self))
+            )
+        try:
+            self.construct(*self.construct_args)
+        finally:
+            if self.stream_to_movie:
+                self.flush_frames()
+                self.close_movie_pipe()
+        if self.write_segments:
+            self.write_segment()
+            self.concatenate_segments()
 
     def construct(self):
         pass #To be implemented in subclasses
@@ -74,8 +111,7 @@ class Scene(object):
         """
         if not all_elements_are_instances(mobjects, Mobject):
             raise Exception("Adding something which is not a mobject")
-        old_mobjects = filter(lambda m : m not in mobjects, self.mobjects)
-        self.mobjects = old_mobjects + list(mobjects)
+        self.mobjects = list_update(self.mobjects, mobjects)
         return self
 
     def add_mobjects_among(self, values):
@@ -90,8 +126,10 @@ class Scene(object):
     def remove(self, *mobjects):
         if not all_elements_are_instances(mobjects, Mobject):
             raise Exception("Removing something which is not a mobject")
-        mobjects = filter(lambda m : m in self.mobjects, mobjects)
-        if len(mobjects) == 0:
+        #Sets compare mobjects by identity, and keep this linear
+        #in the number of mobjects
+        mobjects = set(mobjects)
+        if mobjects.isdisjoint(self.mobjects):
             return
         self.mobjects = filter(lambda m : m not in mobjects, self.mobjects)
         return self
@@ -118,22 +156,32 @@ class Scene(object):
             animation.set_run_time(run_time)
         return animations
 
+    def get_mobject_family_members(self):
+        #Rather than the family of Mobject(*self.mobjects), which
+        #would be a new mobject, and a new tree, on each call
+        return remove_list_redundancies(list(it.chain(*[
+            mob.get_cached_family()
+            for mob in self.mobjects
+        ])))
+
     def separate_moving_and_static_mobjects(self, *animations):
         moving_mobjects = list(it.chain(*[
             anim.mobject.submobject_family()
             for anim in animations
         ]))
-        bundle = Mobject(*self.mobjects)
+        moving_mobject_set = set(moving_mobjects)
         static_mobjects = filter(
-            lambda m : m not in moving_mobjects, 
-            bundle.submobject_family()
+            lambda m : m not in moving_mobject_set, 
+            self.get_mobject_family_members()
         )
         return moving_mobjects, static_mobjects
 
-    def get_time_progression(self, animations):
+    def get_frame_times(self, animations):
         run_time = animations[0].run_time
-        times = np.arange(0, run_time, self.frame_duration)
-        time_progression = ProgressDisplay(times)
+        return np.arange(0, run_time, self.frame_duration)
+
+    def get_time_progression(self, animations):
+        time_progression = ProgressDisplay(self.get_frame_times(animations))
         time_progression.set_description("".join([
             "Animation %d: "%self.num_animations,
             str(animations[0]),
@@ -151,24 +199,80 @@ class Scene(object):
         animations = self.align_run_times(*animations, **kwargs)
         moving_mobjects, static_mobjects = \
             self.separate_moving_and_static_mobjects(*animations)
-        self.update_frame(
-            static_mobjects,
-            include_submobjects = False
-        )
-        static_image = self.get_frame()
+        if self.write_segments:
+            self.write_segment()
+            segment_key = self.get_play_segment_key(
+                animations, moving_mobjects, static_mobjects
+            )
+            num_frames = len(self.get_frame_times(animations))
+            if self.use_cached_segment(segment_key, num_frames):
+                #Frames are skipped, but mobjects must still
+                #end up where the animations leave them
+                for t in self.get_frame_times(animations):
+                    self.update_animations(animations, t)
+                for animation in animations:
+                    animation.clean_up()
+                return self
+        static_image = self.get_static_image(static_mobjects)
 
         for t in self.get_time_progression(animations):
-            for animation in animations:
-                animation.update(t / animation.run_time)
-            self.update_frame(moving_mobjects, static_image)
-            self.frames.append(self.get_frame())
+            self.update_animations(animations, t)
+            self.update_frame(
+                moving_mobjects, static_image,
+                use_layer_cache = True
+            )
+            self.add_frames(self.get_frame())
         for animation in animations:
             animation.clean_up()
+        if self.write_segments:
+            self.write_segment(segment_key)
         return self
 
+    def update_animations(self, animations, t):
+        for animation in animations:
+            animation.update(t / animation.run_time)
+
+    def get_static_image(self, static_mobjects):
+        """
+        Draws static_mobjects, or reuses the image drawn by an
+        earlier call to play when the same mobjects, in the same
+        order and unchanged, were drawn by the same camera.
+        The most recently used images are kept.
+        """
+        camera = self.camera
+        #A digest of the render states, since the states themselves
+        #hold a copy of every point
+        render_hash = hashlib.sha1()
+        self.update_segment_hash(render_hash, static_mobjects)
+        key = (
+            camera.get_geometry(),
+            static_mobjects,
+            render_hash.digest(),
+        )
+        for entry in self.static_image_cache:
+            entry_camera, entry_background, entry_key, image = entry
+            #Mobjects in the keys are compared by identity
+            if entry_camera is camera \
+               and entry_background is camera.background \
+               and entry_key == key:
+                self.static_image_cache.remove(entry)
+                self.static_image_cache.insert(0, entry)
+                return image
+        self.update_frame(
+            static_mobjects,
+            include_submobjects = False
+        )
+        static_image = self.get_frame()
+        if self.static_image_cache_size > 0:
+            self.static_image_cache.insert(0, (
+                camera, camera.background, key, static_image
+            ))
+            del self.static_image_cache[self.static_image_cache_size:]
+        return static_image
+
     def play_over_time_range(self, t0, t1, *animations):
         needed_scene_time = max(abs(t0), abs(t1))
-        existing_scene_time = len(self.frames)*self.frame_duration
+        existing_scene_time = self.get_num_frames()*self.frame_duration
         if existing_scene_time < needed_scene_time:
             self.dither(needed_scene_time - existing_scene_time)
             existing_scene_time = needed_scene_time
@@ -183,7 +287,11 @@ class Scene(object):
         for t in np.arange(t0, t1, self.frame_duration):
             for animation in animations:
                 animation.update((t-t0)/(t1 - t0))
-            index = int(t/self.frame_duration)
+            index = int(t/self.frame_duration) - self.num_flushed_frames
+            if index < 0:
+                raise Exception(
+                    "Frame at time %f was already written to movie"%t
+                )
             self.update_frame(moving_mobjects, self.frames[index])
             self.frames[index] = self.get_frame()
         for animation in animations:
@@ -191,10 +299,41 @@ class Scene(object):
         return self
 
     def dither(self, duration = DEFAULT_DITHER_TIME):
+        num_frames = int(duration / self.frame_duration)
+        if self.write_segments:
+            self.write_segment()
+            segment_key = self.get_dither_segment_key(num_frames)
+            if self.use_cached_segment(segment_key, num_frames):
+                return self
         self.update_frame()
-        self.frames += [self.get_frame()]*int(duration / self.frame_duration)
+        self.add_frames(*[self.get_frame()]*num_frames)
+        if self.write_segments:
+            self.write_segment(segment_key)
+        return self
+
+    def add_frames(self, *frames):
+        self.frames += frames
+        if self.movie_process is not None:
+            self.flush_frames(len(self.frames) - self.frame_buffer_size)
+        return self
+
+    def flush_frames(self, num_frames = None):
+        """
+        Writes the oldest num_frames frames (all of them by default)
+        to the open movie pipe, and drops them from self.frames
+        """
+        if num_frames is None:
+            num_frames = len(self.frames)
+        if num_frames <= 0:
+            return self
+        self.write_frames(self.frames[:num_frames])
+        self.frames = self.frames[num_frames:]
+        self.num_flushed_frames += num_frames
         return self
 
+    def get_num_frames(self):
+        return self.num_flushed_frames + len(self.frames)
+
     def repeat_frames(self, num):
         self.frames = self.frames*num
         return self
@@ -205,10 +344,11 @@ class Scene(object):
 
     def invert_colors(self):
         white_frame = 255*np.ones(self.get_frame().shape, dtype = 'uint8')
-        self.frames = [
-            white_frame-frame
-            for frame in self.frames
-        ]
+        #Invert each held frame once, so repeats stay shared
+        self.frames = list(it.chain(*[
+            [white_frame-frame]*count
+            for frame, count in run_length_encode(self.frames)
+        ]))
         return self
 
     def show_frame(self):
@@ -243,10 +383,16 @@ class Scene(object):
             return
         if name is None:
             name = str(self)
+        self.open_movie_pipe(name)
+        self.write_frames(self.frames)
+        self.close_movie_pipe()
 
+    def open_movie_pipe(self, name):
         file_path = self.get_movie_file_path(name, ".mp4")
         print "Writing to %s"%file_path
+        self.start_movie_process(file_path)
 
+    def start_movie_process(self, file_path):
         fps = int(1/self.frame_duration)
         height, width = self.camera.pixel_shape
 
@@ -266,11 +412,150 @@ class Scene(object):
             '-loglevel', 'error',
             file_path,
         ]
-        process = sp.Popen(command, stdin=sp.PIPE)
-        for frame in self.frames:
-            process.stdin.write(frame.tostring())
-        process.stdin.close()
-        process.wait()        
+        self.movie_process = sp.Popen(command, stdin=sp.PIPE)
+
+    def write_frames(self, frames):
+        """
+        Frames held with dither are the same array repeated,
+        so each run is only serialized once
+        """
+        for frame, count in run_length_encode(frames):
+            frame_bytes = frame.tostring()
+            for x in range(count):
+                self.movie_process.stdin.write(frame_bytes)
+
+    def close_movie_pipe(self):
+        self.movie_process.stdin.close()
+        self.movie_process.wait()
+        self.movie_process = None
+
+    ## Cached movie segments
+
+    def get_segment_hash(self):
+        segment_hash = hashlib.sha1(repr((
+            self.camera.__class__.__name__,
+            self.camera.get_geometry(),
+            self.frame_duration,
+        )))
+        segment_hash.update(self.camera.background.tostring())
+        return segment_hash
+
+    def update_segment_hash(self, segment_hash, mobjects):
+        for mobject in mobjects:
+            segment_hash.update(mobject.__class__.__name__)
+            for value in mobject.get_render_state():
+                if not isinstance(value, str):
+                    value = repr(value)
+                segment_hash.update(value)
+
+    def get_play_segment_key(self, animations, moving_mobjects, static_mobjects):
+        """
+        Hashes everything that determines the frames of a call to play:
+        the static mobjects, and the moving mobjects as they are at each
+        frame.  Copies of the animations are stepped through without
+        rendering, which is cheap next to drawing the frames, so that
+        animations keeping state between updates, like PhaseFlow, are
+        only ever stepped once through the live mobjects.
+        """
+        memo = {}
+        animations = copy.deepcopy(list(animations), memo)
+        moving_mobjects = [
+            copy.deepcopy(mob, memo)
+            for mob in moving_mobjects
+        ]
+        segment_hash = self.get_segment_hash()
+        self.update_segment_hash(segment_hash, static_mobjects)
+        for t in self.get_frame_times(animations):
+            self.update_animations(animations, t)
+            segment_hash.update("frame")
+            self.update_segment_hash(segment_hash, it.chain(*[
+                mob.nonempty_family_members()
+                for mob in moving_mobjects
+            ]))
+        return segment_hash.hexdigest()
+
+    def get_dither_segment_key(self, num_frames):
+        segment_hash = self.get_segment_hash()
+        segment_hash.update(str(num_frames))
+        self.update_segment_hash(segment_hash, filter(
+            lambda m : m.get_num_points() > 0,
+            self.get_mobject_family_members()
+        ))
+        return segment_hash.hexdigest()
+
+    def get_segment_file_path(self, segment_key):
+        return self.get_movie_file_path(
+            os.path.join(
+                self.movie_prefix, str(self) + "_segments", segment_key
+            ),
+            ".mp4"
+        )
+
+    def use_cached_segment(self, segment_key, num_frames):
+        """
+        If a segment was already written under segment_key, it stands
+        in for the next num_frames frames, and this returns True
+        """
+        file_path = self.get_segment_file_path(segment_key)
+        if not os.path.exists(file_path):
+            return False
+        self.segment_files.append(file_path)
+        self.num_flushed_frames += num_frames
+        return True
+
+    def write_segment(self, segment_key = None):
+        """
+        Writes self.frames to their own movie segment.  Without a 
+        segment_key, frames are keyed by their contents, which is
+        how frames added outside of play and dither are handled.
+        """
+        if len(self.frames) == 0:
+            return self
+        if segment_key is None:
+            segment_hash = self.get_segment_hash()
+            for frame, count in run_length_encode(self.frames):
+                segment_hash.update(frame.tostring())
+                segment_hash.update(str(count))
+            segment_key = segment_hash.hexdigest()
+        file_path = self.get_segment_file_path(segment_key)
+        if not os.path.exists(file_path):
+            #Written under another name first, so a segment cut 
+            #short by a crash or interrupt is never reused
+            temp_file_path = os.path.splitext(file_path)[0] + "_partial.mp4"
+            self.start_movie_process(temp_file_path)
+            self.write_frames(self.frames)
+            self.close_movie_pipe()
+            os.rename(temp_file_path, file_path)
+        self.segment_files.append(file_path)
+        self.num_flushed_frames += len(self.frames)
+        self.frames = []
+        return self
+
+    def concatenate_segments(self):
+        if len(self.segment_files) == 0:
+            return
+        file_path = self.get_movie_file_path(
+            os.path.join(self.movie_prefix, str(self)), ".mp4"
+        )
+        print "Writing to %s"%file_path
+        list_file_path = os.path.splitext(file_path)[0] + "_segments.txt"
+        with open(list_file_path, "w") as list_file:
+            for segment_file in self.segment_files:
+                list_file.write("file '%s'\n"%(
+                    os.path.abspath(segment_file).replace("'", "'\\''")
+                ))
+        command = [
+            FFMPEG_BIN,
+            '-y',
+            '-f', 'concat',
+            '-safe', '0',
+            '-i', list_file_path,
+            '-c', 'copy',         # Segments share an encoding
+            '-loglevel', 'error',
+            file_path,
+        ]
+        sp.call(command)
+        os.remove(list_file_path)
 
     # To list possible args that subclasses have
     # Elements should always be a tuple
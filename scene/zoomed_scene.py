@@ -16,6 +16,9 @@ class ZoomedScene(Scene):
         "zoom_factor"               : 6,
         "square_color"              : WHITE,
         "zoom_activated"            : False,
+        #Frames include a zoomed view of every mobject,
+        #so the static ones can't be drawn on their own
+        "static_image_cache_size"   : 0,
     }
     def activate_zooming(self):
         self.generate_big_rectangle()
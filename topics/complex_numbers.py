@@ -1,7 +1,7 @@
 from helpers import *
 
 from number_line import NumberPlane
-from animation.transform import ApplyPointwiseFunction
+from animation.transform import ApplyPointwiseFunction, ApplyMethod
 from animation.simple_animations import Homotopy
 from scene import Scene
 
@@ -81,22 +81,24 @@ class ComplexFunction(ApplyPointwiseFunction):
             self.path_func = path_along_arc(
                 np.log(function(complex(1))).imag
             )
-        ApplyPointwiseFunction.__init__(
-            self,
-            lambda (x, y, z) : complex_to_R3(function(complex(x, y))),
-            instantiate(mobject),
-            **kwargs
+        digest_config(self, kwargs)
+        mobject = instantiate(mobject)
+        ApplyMethod.__init__(
+            self, mobject.apply_complex_function, function,
+            self.vectorized, **kwargs
         )
 
 class ComplexHomotopy(Homotopy):
     def __init__(self, complex_homotopy, mobject = ComplexPlane, **kwargs):
         """
-        Complex Hootopy a function Cx[0, 1] to C
+        Complex Hootopy a function Cx[0, 1] to C.  If vectorized,
+        complex_homotopy is called with an array of complex numbers.
         """
+        #Written so as to also work on arrays
         def homotopy((x, y, z, t)):
-            c = complex_homotopy((complex(x, y), t))
+            c = complex_homotopy((x + 1j*y, t))
             return (c.real, c.imag, z)
-        Homotopy.__init__(self, homotopy, mobject, *args, **kwargs)
+        Homotopy.__init__(self, homotopy, mobject, **kwargs)
 
 
 class ComplexMultiplication(Scene):
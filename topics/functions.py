@@ -4,6 +4,37 @@ from mobject.vectorized_mobject import VMobject
 
 from helpers import *
 
+def refine_samples(get_points_at, inputs, tolerance, max_refinements):
+    """
+    Starting from the given inputs, repeatedly adds the midpoint of
+    any interval whose curve strays more than tolerance from the
+    straight line between its ends, judged by where the midpoint
+    lands.  get_points_at should take an array of inputs and return
+    the corresponding array of points.  Returns the final inputs
+    and points.
+    """
+    inputs = np.array(inputs, dtype = 'float')
+    points = get_points_at(inputs)
+    to_check = np.ones(max(len(inputs) - 1, 0), dtype = 'bool')
+    for x in range(max_refinements):
+        if not to_check.any():
+            break
+        indices = np.arange(len(to_check))[to_check]
+        mid_inputs = (inputs[indices] + inputs[indices+1])/2
+        mid_points = get_points_at(mid_inputs)
+        offsets = mid_points - (points[indices] + points[indices+1])/2
+        errors = np.sqrt((offsets**2).sum(1))
+        refine = errors > tolerance
+        inputs = np.insert(inputs, indices[refine]+1, mid_inputs[refine])
+        points = np.insert(
+            points, indices[refine]+1, mid_points[refine], axis = 0
+        )
+        #Each interval split is replaced by two, both to be checked
+        split = np.zeros(len(to_check), dtype = 'bool')
+        split[indices[refine]] = True
+        to_check = np.repeat(split, split + 1)
+    return inputs, points
+
 class FunctionGraph(VMobject):
     CONFIG = {
         "color" : BLUE_D,
@@ -11,17 +42,36 @@ class FunctionGraph(VMobject):
         "x_max" : SPACE_WIDTH,
         "space_unit_to_num" : 1,
         "epsilon" : 0.5,
+        #If True, function is called once on an array of x values
+        "vectorized" : False,
+        #If True, samples spaced by epsilon are refined until each
+        #piece of the graph is within tolerance of a straight line
+        "adaptive" : False,
+        "tolerance" : 0.01,
+        "max_refinements" : 10,
     }
     def __init__(self, function, **kwargs):
         self.function = function
         VMobject.__init__(self, **kwargs)
 
     def generate_points(self):
-        self.set_anchor_points([
-            x*RIGHT + self.function(x)*UP
-            for pre_x in np.arange(self.x_min, self.x_max, self.epsilon)
-            for x in [self.space_unit_to_num*pre_x]
-        ], mode = "smooth")
+        pre_xs = np.arange(self.x_min, self.x_max, self.epsilon)
+        if self.adaptive:
+            pre_xs, points = refine_samples(
+                self.get_points_at, pre_xs,
+                self.tolerance, self.max_refinements
+            )
+        else:
+            points = self.get_points_at(pre_xs)
+        self.set_anchor_points(points, mode = "smooth")
+
+    def get_points_at(self, pre_xs):
+        xs = self.space_unit_to_num*np.array(pre_xs)
+        if self.vectorized:
+            ys = self.function(xs) + np.zeros(len(xs))
+        else:
+            ys = map(self.function, xs)
+        return np.outer(xs, RIGHT) + np.outer(ys, UP)
 
 
 class ParametricFunction(VMobject):
@@ -29,21 +79,35 @@ class ParametricFunction(VMobject):
         "t_min" : 0,
         "t_max" : 1,
         "epsilon" : 0.1,
+        #If True, function is called once on an array of t values,
+        #and returns an array with a point in each row
+        "vectorized" : False,
+        #If True, samples spaced by epsilon are refined until each
+        #piece of the curve is within tolerance of a straight line
+        "adaptive" : False,
+        "tolerance" : 0.01,
+        "max_refinements" : 10,
     }
     def __init__(self, function, **kwargs):
         self.function = function
         VMobject.__init__(self, **kwargs)
 
     def generate_points(self):
-        self.set_anchor_points([
-            self.function(t)
-            for t in np.arange(
-                self.t_min, 
-                self.t_max+self.epsilon, 
-                self.epsilon
+        ts = np.arange(
+            self.t_min,
+            self.t_max+self.epsilon,
+            self.epsilon
+        )
+        if self.adaptive:
+            ts, points = refine_samples(
+                self.get_points_at, ts,
+                self.tolerance, self.max_refinements
             )
-        ], mode = "smooth")
-
-
+        else:
+            points = self.get_points_at(ts)
+        self.set_anchor_points(points, mode = "smooth")
 
-        
\ No newline at end of file
+    def get_points_at(self, ts):
+        if self.vectorized:
+            return np.array(self.function(ts), dtype = 'float')
+        return np.array(map(self.function, ts), dtype = 'float')
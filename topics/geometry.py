@@ -3,6 +3,19 @@ from helpers import *
 from mobject import Mobject
 from mobject.vectorized_mobject import VMobject
 
+#Points of shapes at unit size, such as those of every Circle and
+#Dot, computed once for each key.  Cleared when it gets too large, 
+#as arcs may be made with any number of different angles.
+UNIT_SHAPE_POINTS = {}
+MAX_UNIT_SHAPES = 1000
+
+def get_unit_shape_points(key, generate):
+    if key not in UNIT_SHAPE_POINTS:
+        if len(UNIT_SHAPE_POINTS) >= MAX_UNIT_SHAPES:
+            UNIT_SHAPE_POINTS.clear()
+        UNIT_SHAPE_POINTS[key] = generate()
+    return UNIT_SHAPE_POINTS[key]
+
 class Arc(VMobject):
     CONFIG = {
         "radius"           : 1.0,
@@ -15,11 +28,20 @@ class Arc(VMobject):
         VMobject.__init__(self, **kwargs)
 
     def generate_points(self):
-        self.set_anchor_points(
-            self.get_unscaled_anchor_points(),
-            mode = "smooth"
+        key = (
+            self.get_unscaled_anchor_points.im_func,
+            self.angle, self.num_anchors, self.start_angle,
+            self.anchors_span_full_range, self.close_new_points,
+            str(self.point_dtype),
         )
-        self.scale(self.radius)
+        def generate_unit_points():
+            self.set_anchor_points(
+                self.get_unscaled_anchor_points(),
+                mode = "smooth"
+            )
+            return self.points
+        unit_points = get_unit_shape_points(key, generate_unit_points)
+        self.points = self.radius*unit_points
 
     def get_unscaled_anchor_points(self):
         step = self.angle/self.num_anchors
@@ -216,16 +238,27 @@ class Polygon(VMobject):
     def get_vertices(self):
         return self.get_anchors_and_handles()[0]
 
-class RegularPolygon(VMobject):
+class RegularPolygon(Polygon):
     CONFIG = {
         "start_angle" : 0
     }
     def __init__(self, n = 3, **kwargs):
         digest_config(self, kwargs, locals())
         start_vect = rotate_vector(RIGHT, self.start_angle)
-        vertices = compass_directions(n, start_angle)
+        vertices = compass_directions(n, start_vect)
         Polygon.__init__(self, *vertices, **kwargs)
 
+    def generate_points(self):
+        key = (
+            RegularPolygon, self.n, self.start_angle, 
+            self.close_new_points, str(self.point_dtype),
+        )
+        def generate_unit_points():
+            Polygon.generate_points(self)
+            return self.points
+        unit_points = get_unit_shape_points(key, generate_unit_points)
+        self.points = np.array(unit_points)
+
 
 class Rectangle(VMobject):
     CONFIG = {